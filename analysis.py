@@ -0,0 +1,69 @@
+#
+# Dominik Mifkovič 2025
+#
+import re
+import unicodedata
+from functools import lru_cache
+
+#spolocna analyza textu pre indexer.py aj search.py
+#dokumenty pri indexovani aj dopyty pri hladani prechadzaju tou istou funkciou, takze sa tokeny vzdy zhoduju
+
+#regex pre tokenizaciu, berie aj cisla
+token_pattern = re.compile(r"[^\W_]+", re.UNICODE)
+#kratke retazce (nazvy, hodnoty poli, dopyty) sa opakuju, ich tokeny sa cachuju
+CACHE_MAX_LEN = 128
+CACHE_SIZE = 65536
+
+
+#tabulka pre str.translate: kombinujuce znaky (diakritika po NFKD) sa zmazu, ostatne ostanu
+#plni sa postupne podla znakov, ktore sa naozaj vyskytnu, namiesto prechodu celeho Unicode pri importe
+class CombiningTable(dict):
+    def __missing__(self, code):
+        value = None if unicodedata.combining(chr(code)) else code
+        self[code] = value
+        return value
+
+COMBINING = CombiningTable()
+
+#NFKD a odstranenie diakritiky, ASCII text sa nemeni
+def strip_accents(text):
+    if text.isascii():
+        return text
+    return unicodedata.normalize("NFKD", text).translate(COMBINING)
+
+def normalize_text(text):
+    if text is None:
+        return ""
+    return strip_accents(str(text)).lower().strip()
+
+def _tokenize(text):
+    return token_pattern.findall(normalize_text(text))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _tokenize_cached(text):
+    return tuple(_tokenize(text))
+
+def tokenize(text):
+    if text is None:
+        return []
+    text = str(text)
+    if len(text) <= CACHE_MAX_LEN:
+        return list(_tokenize_cached(text))
+    return _tokenize(text)
+
+#tokeny vsetkych hodnot, kratke hodnoty idu cez cache
+#vysledok je rovnaky ako tokenize(" ".join(pieces)), medzera oddeli tokeny aj diakritiku susednych hodnot
+def tokenize_values(pieces):
+    tokens = []
+    for piece in pieces:
+        if len(piece) <= CACHE_MAX_LEN:
+            tokens.extend(_tokenize_cached(piece))
+        else:
+            tokens.extend(_tokenize(piece))
+    return tokens
+
+def clear_cache():
+    _tokenize_cached.cache_clear()
+
+def cache_info():
+    return _tokenize_cached.cache_info()
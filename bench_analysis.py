@@ -0,0 +1,99 @@
+#
+# Dominik Mifkovič 2025
+#
+import re
+import sys
+import json
+import time
+import argparse
+import unicodedata
+import analysis
+from indexer import INPUT_FILE, gather_values
+
+#porovnanie povodnej tokenizacie z indexer.py so spolocnou v analysis.py
+#najprv sa overi, ze obe davaju rovnake tokeny pre kazdy dokument, potom sa zmeria rychlost
+
+#povodna implementacia ako referencia
+old_pattern = re.compile(r"[^\W_]+", re.UNICODE)
+
+def old_normalize_text(text):
+    if text is None:
+        return ""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.lower().strip()
+
+def old_tokenize_doc(pieces):
+    return old_pattern.findall(old_normalize_text(" ".join(pieces)))
+
+def load_pieces(path, limit):
+    out = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            out.append(gather_values(json.loads(line)))
+            if limit and len(out) >= limit:
+                break
+    return out
+
+def compare(docs, show):
+    differing = 0
+    for doc_id, pieces in enumerate(docs, 1):
+        a, b = old_tokenize_doc(pieces), analysis.tokenize_values(pieces)
+        if a != b:
+            differing += 1
+            if differing <= show:
+                diff = next(i for i, (x, y) in enumerate(zip(a + [None], b + [None])) if x != y)
+                print(f"[DIFF] doc {doc_id} token {diff}: old {a[diff:diff + 5]!r} new {b[diff:diff + 5]!r}")
+    return differing
+
+#cache sa pred kazdym meranim vyprazdni, meria sa aj plnenie cache ako pri skutocnom indexovani
+def bench(docs, repeat):
+    best_old = best_new = None
+    for _ in range(repeat):
+        start = time.process_time()
+        tokens = sum(len(old_tokenize_doc(pieces)) for pieces in docs)
+        elapsed = time.process_time() - start
+        best_old = elapsed if best_old is None else min(best_old, elapsed)
+
+        analysis.clear_cache()
+        start = time.process_time()
+        for pieces in docs:
+            analysis.tokenize_values(pieces)
+        elapsed = time.process_time() - start
+        best_new = elapsed if best_new is None else min(best_new, elapsed)
+    return tokens, best_old, best_new
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Porovnanie a benchmark tokenizacie indexera")
+    parser.add_argument("--input", default=INPUT_FILE, help="dokumenty z extractor_par.py")
+    parser.add_argument("--limit", type=int, default=0, help="maximalny pocet dokumentov")
+    parser.add_argument("--repeat", type=int, default=3, help="pocet opakovani merania, berie sa najlepsie")
+    parser.add_argument("--show", type=int, default=5, help="kolko rozdielov vypisat")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    docs = load_pieces(args.input, args.limit)
+    if not docs:
+        print("No documents found.")
+        return 1
+    mb = sum(len(p) for pieces in docs for p in pieces) / 1024 / 1024
+    print(f"Loaded {len(docs)} documents ({mb:.1f} MB of text)")
+
+    differing = compare(docs, args.show)
+    print(f"Identical tokens: {len(docs) - differing}/{len(docs)}")
+
+    tokens, old_secs, new_secs = bench(docs, args.repeat)
+    old_rate = tokens / old_secs if old_secs else 0.0
+    new_rate = tokens / new_secs if new_secs else 0.0
+    print(f"old: {old_rate:12.0f} tokens/s")
+    print(f"new: {new_rate:12.0f} tokens/s ({new_rate / old_rate if old_rate else 0.0:.2f}x)")
+    info = analysis.cache_info()
+    print(f"cache: {info.hits} hits, {info.misses} misses, {info.currsize} entries")
+    return 1 if differing else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+from page_store import PageStore
+from extractor_par import SRC_DIR, PAGE_SPECS, filename_to_url, is_not_found, process_html
+
+#rychlost extrakcie v jednom procese, celkovo alebo po poliach PageSpec
+
+#male stranky kazdeho typu s okrajovymi pripadmi regexov (<p matchne aj <pre>, <li aj <link>,
+#odkazy s novym riadkom v texte sa preskocia, soc stranka sa reze na "Decisions adopted by the Committee")
+#a ocakavane dokumenty, overuje ich tests/test_extractor.py
+FIXTURES_DIR = os.path.join("fixtures", "extractor")
+EXPECTED_FILE = "expected.jsonl"
+
+#nacita stranky do pamate, aby sa meral len parsing a nie disk
+def load_pages(src_dir, store_dir, limit):
+    pages = []
+    if store_dir:
+        store = PageStore(store_dir)
+        for url, segment, offset, length, _ in store.records():
+            pages.append((url, store.reader.read(segment, offset, length)))
+            if limit and len(pages) >= limit:
+                break
+        store.close()
+        return pages
+    for root, _, names in os.walk(src_dir):
+        for fname in sorted(names):
+            with open(os.path.join(root, fname), "r", encoding="utf-8", errors="ignore") as f:
+                pages.append((filename_to_url(fname), f.read()))
+            if limit and len(pages) >= limit:
+                return pages
+    return pages
+
+#stranky fixtures bez suboru s ocakavanymi dokumentmi
+def load_fixtures(fixtures_dir):
+    return [(url, html_src) for url, html_src in load_pages(fixtures_dir, None, 0)
+            if url != filename_to_url(EXPECTED_FILE)]
+
+#ocakavane dokumenty fixtures podla url, stranky bez dokumentu (404) v subore nie su
+def load_expected(fixtures_dir):
+    expected = {}
+    with open(os.path.join(fixtures_dir, EXPECTED_FILE), "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                doc = json.loads(line)
+                expected[doc["url"]] = doc
+    return expected
+
+#prepise ocakavane dokumenty fixtures podla aktualnych extraktorov, po zamernej zmene extrakcie
+def update_expected(fixtures_dir):
+    with open(os.path.join(fixtures_dir, EXPECTED_FILE), "w", encoding="utf-8") as f:
+        for url, html_src in sorted(load_fixtures(fixtures_dir)):
+            doc, _ = process_html(html_src, url)
+            if doc:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+#stranky za sekundu, berie sa najlepsi z repeat behov
+def bench(pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        for url, html_src in pages:
+            process_html(html_src, url)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(pages) / best if best else 0.0
+
+#cas jednotlivych poli regex extraktorov, ukaze kde sa trava cas extrakcie
+def bench_fields(pages, repeat):
+    timings = {spec.type: Counter() for spec in PAGE_SPECS}
+    counts = Counter()
+    for url, html_src in pages:
+        if is_not_found(html_src):
+            continue
+        for spec in PAGE_SPECS:
+            if spec.url_re.match(url):
+                counts[spec.type] += 1
+                for _ in range(repeat):
+                    spec.extract(html_src, url, timings[spec.type])
+                break
+    for doc_type, fields in timings.items():
+        total = sum(fields.values())
+        if not counts[doc_type]:
+            continue
+        print(f"{doc_type}: {counts[doc_type]} pages, {total / repeat / counts[doc_type] * 1e6:.0f} us/page")
+        for field, spent in fields.most_common():
+            print(f"  {field:22s} {spent / repeat / counts[doc_type] * 1e6:8.1f} us/page {100 * spent / total:5.1f}%")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark extrakcie dokumentov")
+    parser.add_argument("--src", default=SRC_DIR, help="adresar so stiahnutymi strankami")
+    parser.add_argument("--store", help="citat stranky z page store")
+    parser.add_argument("--limit", type=int, default=0, help="maximalny pocet stranok")
+    parser.add_argument("--repeat", type=int, default=3, help="pocet opakovani merania, berie sa najlepsie")
+    parser.add_argument("--fields", action="store_true", help="zmerat cas kazdeho pola")
+    parser.add_argument("--update-expected", nargs="?", const=FIXTURES_DIR, metavar="DIR",
+                        help="prepisat ocakavane dokumenty fixtures podla aktualnej extrakcie")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.update_expected:
+        update_expected(args.update_expected)
+        return 0
+    pages = load_pages(args.src, args.store, args.limit)
+    if not pages:
+        print("No pages found.")
+        return 1
+    mb = sum(len(h) for _, h in pages) / 1024 / 1024
+    print(f"Loaded {len(pages)} pages ({mb:.1f} MB)")
+
+    if args.fields:
+        bench_fields(pages, args.repeat)
+        return 0
+
+    print(f"{bench(pages, args.repeat):.1f} pages/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import sys
+import json
+import mmap
+import shutil
+import struct
+from array import array
+from itertools import accumulate
+import bm25
+from query_cache import QueryCache
+
+#binarny invertovany index, search.py ho otvara cez mmap a postings dekoduje az pri dopyte
+#index.terms    - hlavicka, tabulka termov zoradena podla termu (binarne vyhladavanie) a blob s textami termov
+#index.postings - postings kazdeho termu ako varinty: rozdiel doc_id od predosleho, tf, rozdiel, tf, ...
+#                 dlhsie postings maju pred sebou skip tabulku blokov, dopyt podla nej preskakuje bloky bez dekodovania
+#index.docs     - tabulka offsetov podla doc_id, BM25 normy dokumentov a JSON metadata dokumentov (url, title, type, length)
+TERMS_FILE = "index.terms"
+POSTINGS_FILE = "index.postings"
+DOCS_FILE = "index.docs"
+
+MAGIC = b"WHIX"
+VERSION = 4
+#magic, verzia, pocet termov, pocet dokumentov, offset blobu s termami
+HEADER = struct.Struct("<4sHIIQ")
+#offset termu v blobe, dlzka termu, df, offset postings, dlzka postings, globalne tf, najvacsie tf,
+#BM25 idf a najvacsi BM25 impact
+ENTRY = struct.Struct("<QIIQIQIdd")
+#postings sa delia na bloky po tolko dokumentov, skip tabulka sa zapisuje len pre termy s viac nez jednym blokom
+BLOCK_SIZE = 128
+#posledne doc_id bloku, koniec bloku v postings termu (v bajtoch), najvacsie tf a najvacsi BM25 impact v bloku
+SKIP = struct.Struct("<IIId")
+#kolko dekodovanych postings a blokov castych termov drzi BinaryIndex v pamati
+POSTINGS_CACHE_SIZE = 4096
+DOCS_HEADER = struct.Struct("<4sHI")
+OFFSET = struct.Struct("<Q")
+NORM = struct.Struct("<d")
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varints(buf):
+    values = []
+    value = shift = 0
+    for b in buf:
+        value |= (b & 0x7F) << shift
+        if b & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+#postings [(doc_id, tf)] zoradene podla doc_id
+def encode_postings(postings):
+    out = bytearray()
+    last = 0
+    for doc_id, tf in postings:
+        encode_varint(doc_id - last, out)
+        encode_varint(tf, out)
+        last = doc_id
+    return bytes(out)
+
+def decode_postings(buf):
+    values = decode_varints(buf)
+    return list(zip(accumulate(values[0::2]), values[1::2]))
+
+#postings ako encode_postings, skip tabulka blokov a najvacsi BM25 impact
+#rozdiely doc_id pokracuju cez hranice blokov, blok sa dekoduje od posledneho doc_id predosleho bloku
+def encode_blocks(postings, norms):
+    data = bytearray()
+    skips = bytearray()
+    last = 0
+    max_impact = 0.0
+    for i in range(0, len(postings), BLOCK_SIZE):
+        block = postings[i:i + BLOCK_SIZE]
+        for doc_id, tf in block:
+            encode_varint(doc_id - last, data)
+            encode_varint(tf, data)
+            last = doc_id
+        impact = max(bm25.impact(tf, norms[doc_id]) for doc_id, tf in block)
+        max_impact = max(max_impact, impact)
+        skips += SKIP.pack(last, len(data), max(tf for _, tf in block), impact)
+    if len(postings) <= BLOCK_SIZE:
+        skips = b""
+    return bytes(skips), bytes(data), max_impact
+
+#doc_id a tf jedneho bloku, base je posledne doc_id predosleho bloku
+def decode_block(buf, base):
+    values = decode_varints(buf)
+    values[0] += base
+    return list(accumulate(values[0::2])), values[1::2]
+
+def exists(base_dir="."):
+    return all(os.path.exists(os.path.join(base_dir, name)) for name in (TERMS_FILE, POSTINGS_FILE, DOCS_FILE))
+
+
+#zapisuje index po termoch, termy musia prichadzat zoradene
+#postings idu rovno do suboru, v pamati zostava len tabulka termov
+#norms su BM25 normy dokumentov podla doc_id (bm25.doc_norms), z nich sa pocitaju impacty
+class IndexWriter:
+    def __init__(self, norms, base_dir="."):
+        self.norms = norms
+        self.n_docs = len(norms) - 1
+        self.base_dir = base_dir
+        self.postings = open(os.path.join(base_dir, POSTINGS_FILE + ".tmp"), "wb")
+        self.offset = 0
+        self.entries = bytearray()
+        self.blob = bytearray()
+        self.count = 0
+        self.last = None
+
+    def add(self, term, postings, global_tf=None):
+        if self.last is not None and term <= self.last:
+            raise ValueError(f"Terms must be added in sorted order: {term!r} after {self.last!r}")
+        self.last = term
+        skips, data, max_impact = encode_blocks(postings, self.norms)
+        raw = term.encode("utf-8")
+        if global_tf is None:
+            global_tf = sum(tf for _, tf in postings)
+        max_tf = max(tf for _, tf in postings)
+        #offset postings ukazuje za skip tabulku, jej dlzka sa da vypocitat z df
+        self.entries += ENTRY.pack(len(self.blob), len(raw), len(postings), self.offset + len(skips),
+                                   len(data), global_tf, max_tf, bm25.idf(len(postings), self.n_docs), max_impact)
+        self.blob += raw
+        self.postings.write(skips)
+        self.postings.write(data)
+        self.offset += len(skips) + len(data)
+        self.count += 1
+
+    #docs: dvojice (doc_id, metadata dokumentu) zoradene podla doc_id
+    def close(self, total_docs, docs):
+        self.postings.close()
+        terms_tmp = os.path.join(self.base_dir, TERMS_FILE + ".tmp")
+        with open(terms_tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.count, total_docs, HEADER.size + len(self.entries)))
+            f.write(self.entries)
+            f.write(self.blob)
+        docs_tmp = os.path.join(self.base_dir, DOCS_FILE + ".tmp")
+        write_docs(docs_tmp, total_docs, docs, self.norms)
+        #terms sa prepisuje posledny, search podla neho pozna hotovy index
+        os.replace(os.path.join(self.base_dir, POSTINGS_FILE + ".tmp"), os.path.join(self.base_dir, POSTINGS_FILE))
+        os.replace(docs_tmp, os.path.join(self.base_dir, DOCS_FILE))
+        os.replace(terms_tmp, os.path.join(self.base_dir, TERMS_FILE))
+
+#metadata sa zapisuju priebezne do docasneho blobu, v pamati je len tabulka offsetov (8 B na dokument)
+#za offsetmi su BM25 normy podla doc_id, search ich cita priamo z mmap
+def write_docs(path, total_docs, docs, norms):
+    offsets = array("Q")
+    size = 0
+    blob_path = path + ".blob"
+    with open(blob_path, "wb") as blob:
+        for doc_id, meta in docs:
+            while len(offsets) <= doc_id:
+                offsets.append(size)
+            data = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            blob.write(data)
+            size += len(data)
+    while len(offsets) <= total_docs + 1:
+        offsets.append(size)
+    norms = array("d", norms[:total_docs + 1])
+    #subor je little-endian ako OFFSET a NORM
+    if sys.byteorder == "big":
+        offsets.byteswap()
+        norms.byteswap()
+    with open(path, "wb") as f:
+        f.write(DOCS_HEADER.pack(MAGIC, VERSION, total_docs))
+        f.write(offsets.tobytes())
+        f.write(norms.tobytes())
+        with open(blob_path, "rb") as blob:
+            shutil.copyfileobj(blob, f)
+    os.remove(blob_path)
+
+def open_mmap(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+#metadata dokumentov podla doc_id, JSON sa dekoduje az pri pristupe
+class DocTable:
+    def __init__(self, path):
+        self.mm = open_mmap(path)
+        magic, version, self.total_docs = DOCS_HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: unsupported docs file")
+        norms_start = DOCS_HEADER.size + OFFSET.size * (self.total_docs + 2)
+        self.blob_start = norms_start + NORM.size * (self.total_docs + 1)
+        #BM25 normy podla doc_id, na little-endian stroji priamo pohlad do mmap
+        if sys.byteorder == "little":
+            self.norms = memoryview(self.mm)[norms_start:self.blob_start].cast("d")
+        else:
+            self.norms = array("d", self.mm[norms_start:self.blob_start])
+            self.norms.byteswap()
+
+    def get(self, doc_id, default=None):
+        if not 0 <= doc_id <= self.total_docs:
+            return default
+        pos = DOCS_HEADER.size + OFFSET.size * doc_id
+        start, = OFFSET.unpack_from(self.mm, pos)
+        end, = OFFSET.unpack_from(self.mm, pos + OFFSET.size)
+        if start == end:
+            return default
+        return json.loads(self.mm[self.blob_start + start:self.blob_start + end])
+
+    def close(self):
+        if isinstance(self.norms, memoryview):
+            self.norms.release()
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+
+
+#index otvoreny cez mmap, pri starte sa cita len hlavicka
+#term sa hlada binarnym vyhladavanim v tabulke termov, pamat rastie len s dekodovanymi postings
+#dekodovane postings, skip tabulky a bloky sa drzia v LRU cache, caste termy sa tak nedekoduju pri kazdom dopyte
+class BinaryIndex:
+    def __init__(self, base_dir=".", cache_size=POSTINGS_CACHE_SIZE):
+        self.terms = open_mmap(os.path.join(base_dir, TERMS_FILE))
+        magic, version, self.count, self.n_docs, self.blob_start = HEADER.unpack_from(self.terms, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{TERMS_FILE}: unsupported index version, rebuild it with indexer.py --binary")
+        self.postings_mm = open_mmap(os.path.join(base_dir, POSTINGS_FILE))
+        self.docs = DocTable(os.path.join(base_dir, DOCS_FILE))
+        self.postings_cache = QueryCache(cache_size, ttl=None)
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self.terms, HEADER.size + i * ENTRY.size)
+
+    def _term(self, entry):
+        start = self.blob_start + entry[0]
+        return self.terms[start:start + entry[1]]
+
+    #(df, offset postings, dlzka postings, globalne tf, najvacsie tf, BM25 idf, najvacsi BM25 impact) alebo None
+    def lookup(self, term):
+        raw = term.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            found = self._term(entry)
+            if found < raw:
+                lo = mid + 1
+            elif found > raw:
+                hi = mid
+            else:
+                return entry[2:]
+        return None
+
+    def df(self, term):
+        entry = self.lookup(term)
+        return entry[0] if entry else 0
+
+    #[(doc_id, tf)] alebo default, rovnake rozhranie ako dict z index.jsonl
+    def get(self, term, default=None):
+        postings = self.postings_cache.get(("postings", term))
+        if postings is None:
+            entry = self.lookup(term)
+            if entry is None:
+                return default
+            offset, length = entry[1:3]
+            postings = decode_postings(self.postings_mm[offset:offset + length])
+            self.postings_cache.put(("postings", term), postings)
+        return postings
+
+    #skip tabulka termu: (df, BM25 idf, offset postings, posledne doc_id, konce, najvacsie tf
+    #a najvacsie BM25 impacty blokov) alebo None
+    #kratke postings tabulku nemaju, ich jediny blok sa dekoduje hned
+    def blocks(self, term):
+        blocks = self.postings_cache.get(("blocks", term))
+        if blocks is None:
+            blocks = self._blocks(term)
+            if blocks is not None:
+                self.postings_cache.put(("blocks", term), blocks)
+        return blocks
+
+    def _blocks(self, term):
+        entry = self.lookup(term)
+        if entry is None:
+            return None
+        df, offset, length, _, max_tf, idf, max_impact = entry
+        n_blocks = -(-df // BLOCK_SIZE)
+        if n_blocks == 1:
+            docs, _ = decode_block(self.postings_mm[offset:offset + length], 0)
+            return df, idf, offset, [docs[-1]], [length], [max_tf], [max_impact]
+        start = offset - n_blocks * SKIP.size
+        table = list(zip(*SKIP.iter_unpack(self.postings_mm[start:offset])))
+        return (df, idf, offset) + tuple(list(column) for column in table)
+
+    #doc_id a tf jedneho bloku z tabulky blocks()
+    def read_block(self, offset, start, end, base):
+        key = ("block", offset, start)
+        block = self.postings_cache.get(key)
+        if block is None:
+            block = decode_block(self.postings_mm[offset + start:offset + end], base)
+            self.postings_cache.put(key, block)
+        return block
+
+    #vsetky termy v poradi s ich zaznamom, pre kontrolu a export
+    def items(self):
+        for i in range(self.count):
+            entry = self._entry(i)
+            yield self._term(entry).decode("utf-8"), entry[2:]
+
+    def close(self):
+        self.postings_cache.clear()
+        for mm in (self.terms, self.postings_mm):
+            if isinstance(mm, mmap.mmap):
+                mm.close()
+        self.docs.close()
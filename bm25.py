@@ -0,0 +1,33 @@
+#
+# Dominik Mifkovič 2025
+#
+import math
+from array import array
+
+#BM25 spolocne pre indexer.py a search.py
+#indexer z dlzok dokumentov predpocita normu kazdeho dokumentu a pre kazdy term idf a najvacsi impact,
+#search potom pre posting pocita len idf * impact(tf, norma)
+#vsetko sa pocita tymito funkciami v rovnakom poradi operacii, takze najvacsi impact z indexu
+#je presne rovny impactu najlepsieho postingu a da sa pouzit ako horny odhad pri prerezavani
+K1 = 1.2
+B = 0.75
+
+#idf s +1, nikdy nie je zaporne ani pri termoch vo viac nez polovici dokumentov
+def idf(df, n_docs):
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+#normalizacia dlzky dokumentu, K1 pre dokument priemernej dlzky
+def doc_norm(length, avg_length):
+    if not avg_length:
+        return K1
+    return K1 * (1 - B + B * length / avg_length)
+
+def impact(tf, norm):
+    return tf * (K1 + 1) / (tf + norm)
+
+#normy dokumentov podla doc_id z dvojic (doc_id, dlzka), doc_id 0 a dokumenty bez tokenov maju normu K1
+def doc_norms(lengths, total_docs, avg_length):
+    norms = array("d", [K1]) * (total_docs + 1)
+    for doc_id, length in lengths:
+        norms[doc_id] = doc_norm(length, avg_length)
+    return norms
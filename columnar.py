@@ -0,0 +1,198 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import json
+import heapq
+import shutil
+from collections import defaultdict
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+#stlpcova kopia pages.jsonl v Parquet, rozdelena podla typu dokumentu do priecinkov type=<typ>
+#(hive particie, Spark aj pyarrow z nich dopocitaju stlpec type a filter na typ cita len jeden priecinok)
+#doc_id je poradie riadku v pages.jsonl od 1, rovnako ako v indexer.py a search.py
+PARQUET_DIR = "pages_parquet"
+#z ktoreho pages.jsonl boli subory vytvorene, podla toho citatelia poznaju ci su aktualne
+SOURCE_FILE = "_source.json"
+ROW_GROUP = 10000
+
+STRINGS = pa.list_(pa.string())
+
+#explicitne schemy, Spark tak nemusi schemu odhadovat z roznorodych JSON riadkov
+SCHEMAS = {
+    "list_property": pa.schema([
+        ("doc_id", pa.int64()),
+        ("url", pa.string()),
+        ("property_id", pa.int64()),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("state_parties", STRINGS),
+        ("region", pa.string()),
+        ("category", pa.string()),
+        ("criteria", STRINGS),
+        ("inscription_year", pa.int32()),
+        ("area_hectares", pa.float64()),
+        ("coordinates", pa.struct([("lat", pa.float64()), ("lon", pa.float64())])),
+        ("text", pa.string())
+    ]),
+    "decision": pa.schema([
+        ("doc_id", pa.int64()),
+        ("url", pa.string()),
+        ("decision_id", pa.int64()),
+        ("title", pa.string()),
+        ("decision_code", pa.string()),
+        ("session_code", pa.string()),
+        ("year", pa.int32()),
+        ("related_property_id", pa.int64()),
+        ("text", pa.string()),
+        ("themes", STRINGS),
+        ("focal_point", pa.string()),
+        ("states_parties", STRINGS),
+        ("properties", STRINGS),
+        ("session_name", pa.string()),
+        ("soc_reports", pa.list_(pa.struct([("soc_id", pa.int64()), ("title", pa.string())])))
+    ]),
+    "soc": pa.schema([
+        ("doc_id", pa.int64()),
+        ("url", pa.string()),
+        ("soc_id", pa.int64()),
+        ("title", pa.string()),
+        ("year", pa.int32()),
+        ("related_property_id", pa.int64()),
+        ("site_name", pa.string()),
+        ("summary", pa.string()),
+        ("text", pa.string())
+    ])
+}
+
+def partition_dir(out_dir, doc_type):
+    return os.path.join(out_dir, f"type={doc_type}")
+
+def source_stamp(source):
+    st = os.stat(source)
+    return {"source": os.path.basename(source), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+#True ak Parquet vznikol z aktualnej verzie pages.jsonl
+def is_fresh(out_dir=PARQUET_DIR, source="pages.jsonl"):
+    stamp_path = os.path.join(out_dir, SOURCE_FILE)
+    if not os.path.exists(stamp_path) or not os.path.exists(source):
+        return False
+    with open(stamp_path, "r", encoding="utf-8") as f:
+        stamp = json.load(f)
+    current = source_stamp(source)
+    return stamp["size"] == current["size"] and stamp["mtime_ns"] == current["mtime_ns"]
+
+#schema rozsirena o stlpce z davky riadkov
+#polia mimo SCHEMAS (typ bez schemy alebo nove pole v PageSpec) dostanu v kazdej davke typ odhadnuty z hodnot
+#a zjednoteny so schemou, napr. null -> string ked prva davka mala len None, alebo int64 -> double
+#pole bez zhodneho typu (cislo aj retazec) skonci chybou namiesto tichej straty hodnot
+def widen_schema(schema, rows, fixed):
+    known = {field.name for field in fixed}
+    names = []
+    for row in rows:
+        for name in row:
+            if name not in known and name not in names:
+                names.append(name)
+    if not names:
+        return schema
+    inferred = pa.Table.from_pylist([{name: row.get(name) for name in names} for row in rows]).schema
+    return pa.unify_schemas([schema, inferred], promote_options="permissive")
+
+#tabulka pretypovana na sirsiu schemu, chybajuce stlpce su prazdne
+def conform(table, schema):
+    columns = [
+        table.column(field.name).cast(field.type) if field.name in table.column_names
+        else pa.nulls(len(table), field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+#prepise pages.jsonl do Parquet, vrati pocet dokumentov podla typu
+#zapisuje sa do docasneho priecinka, citatelia nikdy neuvidia napoly zapisany vystup
+def write_parquet(source="pages.jsonl", out_dir=PARQUET_DIR, row_group=ROW_GROUP):
+    tmp_dir = out_dir + ".tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+    stamp = source_stamp(source)
+
+    writers = {}
+    #aktualna schema kazdeho typu, zacina zo SCHEMAS (alebo prazdna) a rozsiruje sa podla dat
+    schemas = {}
+    buffers = defaultdict(list)
+    counts = defaultdict(int)
+
+    def flush(doc_type):
+        rows = buffers.pop(doc_type)
+        schema = schemas.get(doc_type)
+        if schema is None:
+            schema = SCHEMAS.get(doc_type, pa.schema([]))
+        schema = widen_schema(schema, rows, SCHEMAS.get(doc_type, ()))
+        writer = writers.get(doc_type)
+        path = os.path.join(partition_dir(tmp_dir, doc_type), "part-00000.parquet")
+        if writer is None:
+            os.makedirs(partition_dir(tmp_dir, doc_type))
+            writer = writers[doc_type] = pq.ParquetWriter(path, schema)
+        elif not schema.equals(schemas[doc_type]):
+            #Parquet subor ma jednu schemu, uz zapisane riadky sa prepisu do novej
+            writer.close()
+            written = pq.read_table(path)
+            writer = writers[doc_type] = pq.ParquetWriter(path, schema)
+            writer.write_table(conform(written, schema), row_group_size=row_group)
+        schemas[doc_type] = schema
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema), row_group_size=row_group)
+
+    doc_id = 0
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            doc_id += 1
+            row = json.loads(line)
+            #type je v nazve particie, v suboroch sa neopakuje
+            doc_type = row.pop("type", None) or "unknown"
+            row["doc_id"] = doc_id
+            buffers[doc_type].append(row)
+            counts[doc_type] += 1
+            if len(buffers[doc_type]) >= row_group:
+                flush(doc_type)
+
+    for doc_type in list(buffers):
+        flush(doc_type)
+    for writer in writers.values():
+        writer.close()
+    with open(os.path.join(tmp_dir, SOURCE_FILE), "w", encoding="utf-8") as f:
+        json.dump(dict(stamp, docs=doc_id), f)
+
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return dict(counts)
+
+#dokumenty zo vsetkych particii v poradi doc_id ako dvojice (doc_id, doc)
+#doc vyzera ako riadok z pages.jsonl, prazdne stlpce sa vynechaju
+def iter_docs(out_dir=PARQUET_DIR):
+    def read_partition(name):
+        doc_type = name.split("=", 1)[1]
+        for path in sorted(os.listdir(os.path.join(out_dir, name))):
+            pf = pq.ParquetFile(os.path.join(out_dir, name, path))
+            for batch in pf.iter_batches():
+                for row in batch.to_pylist():
+                    doc_id = row.pop("doc_id")
+                    #poradie klucov ako v pages.jsonl (url, type, polia extraktora)
+                    doc = {"url": row.pop("url"), "type": doc_type}
+                    doc.update((k, v) for k, v in row.items() if v is not None)
+                    yield doc_id, doc
+
+    partitions = [name for name in sorted(os.listdir(out_dir)) if name.startswith("type=")]
+    #kazda particia je zoradena podla doc_id, staci ich zlucit
+    yield from heapq.merge(*(read_partition(name) for name in partitions), key=lambda item: item[0])
+
+#len vybrane stlpce zo vsetkych particii ako dict stlpec -> zoznam hodnot
+def read_columns(columns, out_dir=PARQUET_DIR):
+    dataset = ds.dataset(out_dir, format="parquet", partitioning="hive")
+    return dataset.to_table(columns=columns).to_pydict()
+
@@ -0,0 +1,129 @@
+#
+# Dominik Mifkovič 2025
+#
+import json
+import time
+import bisect
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EVENTS_FILE = "crawl_events.jsonl"
+#hranice histogramov latencie v sekundach
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+#jeden JSON riadok na kazdy fetch, zapisuje sa po davkach
+class EventLog:
+    def __init__(self, path=EVENTS_FILE, batch=100):
+        self.out = open(path, "a", encoding="utf-8")
+        self.batch = batch
+        self.buffer = []
+        self.lock = threading.Lock()
+
+    def write(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.buffer.append(line)
+            if len(self.buffer) >= self.batch:
+                self._flush()
+
+    def _flush(self):
+        self.out.write("".join(self.buffer))
+        self.out.flush()
+        self.buffer = []
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.out.close()
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    #riadky v Prometheus formate, buckety su kumulativne
+    def render(self, name):
+        lines = [f"# TYPE {name} histogram"]
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {total}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum:.6f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+#pocitadla a histogramy crawlu, vypisuju sa v textovom formate Prometheus
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.started = time.time()
+
+    #labels je tuple dvojic (meno, hodnota)
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters.setdefault(name, Counter())[labels] += value
+
+    def observe(self, name, value):
+        with self.lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(value)
+
+    #gauge sa vypocita az pri vypise
+    def gauge(self, name, func):
+        self.gauges[name] = func
+
+    def render(self):
+        with self.lock:
+            lines = []
+            for name, values in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(values.items()):
+                    label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                    lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+            for name, hist in sorted(self.histograms.items()):
+                lines.extend(hist.render(name))
+        for name, func in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {func()}")
+        lines.append("# TYPE crawler_uptime_seconds gauge")
+        lines.append(f"crawler_uptime_seconds {time.time() - self.started:.1f}")
+        return "\n".join(lines) + "\n"
+
+
+#spusti lokalny http server s /metrics v samostatnom vlakne
+def serve_metrics(metrics, port, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        #bez logovania kazdeho requestu na konzolu
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
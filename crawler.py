@@ -3,23 +3,82 @@
 #
 import os
 import sys
+import json
 import re
 import time
 import html
 import random
-import urllib.robotparser
+import resource
+import hashlib
+import asyncio
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
+import aiohttp
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
+from frontier import Frontier, FRONTIER_DB, DEFAULT_PRIORITY
+from page_store import PageStore, STORE_DIR, page_file_name
+from robots_cache import RobotsCache, ROBOTS_CACHE, ROBOTS_TTL
+from crawl_metrics import EventLog, Metrics, serve_metrics, EVENTS_FILE
 
-visited_pages = set()
-discovered_links = set()
-robots_parsers = {}
+frontier = None
+link_log = None
+#ak je nastaveny, stranky sa ukladaju do segmentov namiesto pages/
+page_store = None
+robots = None
+#event log jednotlivych fetchov a metriky pre /metrics
+events = None
+metrics = Metrics()
+#pocty novych, zmenenych a nezmenenych stranok
+change_counts = Counter()
+changes_lock = threading.Lock()
+#kolko stranok s danou prioritou sa stiahlo
+fetched_by_priority = Counter()
+#ak je True, stranky bez pravidla sa do frontier vobec nepridaju
+skip_low = False
+#cas (monotonic) po ktorom sa crawl zastavi
+crawl_deadline = None
 
 BASE_URL = "https://whc.unesco.org/en/"
 
+#nastavenia http enginu
+HTTP_CONCURRENCY = 16
+HTTP_PER_HOST = 4
+HTTP_TIMEOUT = 20
+#opakovania pri sietovej chybe alebo 5xx, cakanie sa zdvojnasobuje
+HTTP_RETRIES = 2
+HTTP_RETRY_BACKOFF = 1.0
+
+#nastavenia selenium workerov
+DEFAULT_WORKERS = 1
+#max requestov za sekundu na jeden host, None = bez limitu, plati len Crawl-delay z robots.txt
+DEFAULT_HOST_RATE = None
+
+#zoznam zmenenych stranok pre extraktor
+CHANGES_FILE = "changes.jsonl"
+LINKS_FILE = "links.txt"
+#links.txt sa zapisuje po davkach, stav crawlu je aj tak vo frontier databaze
+LINK_FLUSH_BATCH = 500
+LINK_FLUSH_SEC = 5.0
+
+#priority stranok, nizsie cislo sa stahuje skor
+#z list/decisions/soc stranok vznikaju dokumenty v extraktore, zoznamy a krajiny na ne odkazuju
+DOC_PRIORITY = 0
+HUB_PRIORITY = 1
+PRIORITY_RULES = [
+    (re.compile(r"/en/(?:list|decisions|soc)/\d+$"), DOC_PRIORITY),
+    (re.compile(r"/en(?:/(?:list|decisions|soc|statesparties|sessions)(?:/[^/]+)?)?$"), HUB_PRIORITY),
+]
+
+HREF_RE = re.compile(r'href=["\'](.*?)["\']', re.IGNORECASE)
+#stranky ktore bez JS nic nezobrazia
+NOSCRIPT_RE = re.compile(r"<noscript[^>]*>[^<]*\b(?:enable|requires?)\s+javascript", re.IGNORECASE)
+
 #vygenerovane cez https://useragents.io/random
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.6668.71 Safari/537.36",
@@ -56,24 +115,14 @@ def rotate_user_agent(driver):
     #pouzije chrome devtools prikaz na zmenu agenta lebo vytvaranie noveho drivera bolo prilis pomale
     driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
 
+#scheme://host pre URL, kluc do robots cache aj rate limitera
+def url_base(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
 #vrati True ak je dane URL dovolene podla robots.txt
 def allowed_by_robots(url):
-    parsed = urlparse(url)
-    base = f"{parsed.scheme}://{parsed.netloc}"
-    if base not in robots_parsers:
-        rp = urllib.robotparser.RobotFileParser()
-        rp.set_url(urljoin(base, "/robots.txt"))
-        try:
-            rp.read()
-        except Exception:
-            #ak sa robots.txt neda nacitat, predpokladame ze mozeme
-            robots_parsers[base] = None
-            return True
-        robots_parsers[base] = rp
-    rp = robots_parsers[base]
-    if rp is None:
-        return True
-    return rp.can_fetch("*", url)
+    return robots.allowed(url_base(url), url)
 
 #vrati True ak URL patri do rovnakej domeny ako BASE_URL
 def in_same_domain(url):
@@ -82,6 +131,18 @@ def in_same_domain(url):
     return target.startswith(base)
 
 
+#vrati prioritu URL podla PRIORITY_RULES alebo None ak sa ma preskocit
+def page_priority(url):
+    path = urlparse(url).path.rstrip("/")
+    for pattern, priority in PRIORITY_RULES:
+        if pattern.search(path):
+            return priority
+    return None if skip_low else DEFAULT_PRIORITY
+
+#vrati True ak uz vyprsal casovy limit crawlu
+def budget_exhausted():
+    return crawl_deadline is not None and time.monotonic() >= crawl_deadline
+
 #vycisti query parametre
 def clean_url(url):
     url = html.unescape(url)
@@ -96,110 +157,510 @@ def clean_url(url):
     return normalized
 
 
+#cesta k suboru v pages/ pre danu normalizovanu URL
+def page_path(normalized):
+    return os.path.join("pages", f"{page_file_name(normalized)}.html")
+
+#ulozi html stranky do page store alebo do adresara pages/
+def save_page(normalized, html_source):
+    if page_store is not None:
+        page_store.put(normalized, html_source)
+        return
+    os.makedirs("pages", exist_ok=True)
+    file_path = page_path(normalized)
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(html_source)
+
+#buffrovany zapis objavenych linkov, subor sa otvori raz a zapisuje sa po davkach
+class LinkLog:
+    def __init__(self, path=LINKS_FILE, batch=LINK_FLUSH_BATCH, interval=LINK_FLUSH_SEC):
+        self.out = open(path, "a", encoding="utf-8")
+        self.batch = batch
+        self.interval = interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def write(self, link):
+        with self.lock:
+            self.buffer.append(f"{html.escape(link)}\n")
+            if len(self.buffer) >= self.batch or time.monotonic() - self.last_flush >= self.interval:
+                self._flush()
+
+    def _flush(self):
+        self.out.write("".join(self.buffer))
+        self.out.flush()
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.out.close()
+
+#oznaci stranku ako navstivenu a zapocita ju podla priority
+def mark_visited(normalized):
+    frontier.mark_visited(normalized)
+    priority = page_priority(normalized)
+    with changes_lock:
+        fetched_by_priority[DEFAULT_PRIORITY if priority is None else priority] += 1
+
+#zapocita stranku, ktorej obsah sa nezmenil (304 alebo rovnaky hash)
+def count_unchanged():
+    with changes_lock:
+        change_counts["unchanged"] += 1
+
+#zapise udalost o novej alebo zmenenej stranke, extraktor podla nej spracuje len dotknute dokumenty
+def emit_change(url, event, body_hash):
+    with changes_lock:
+        change_counts[event] += 1
+        with open(CHANGES_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"url": url, "event": event, "hash": body_hash, "time": time.time()}) + "\n")
+
+#zapise jeden fetch do event logu a zapocita ho do metrik
+def record_fetch(url, engine, status=None, size=0, fetch_latency=None, render_latency=None, retries=0, error=None):
+    if events is not None:
+        events.write({
+            "time": round(time.time(), 3),
+            "url": url,
+            "engine": engine,
+            "status": status,
+            "bytes": size,
+            "fetch_latency": None if fetch_latency is None else round(fetch_latency, 4),
+            "render_latency": None if render_latency is None else round(render_latency, 4),
+            "retries": retries,
+            "error": error
+        })
+    result = "failed" if error else ("unchanged" if status == 304 else "ok")
+    metrics.inc("crawler_pages_total", (("result", result),))
+    if error:
+        metrics.inc("crawler_errors_total", (("error", error),))
+    if size:
+        metrics.inc("crawler_bytes_total", value=size)
+    if retries:
+        metrics.inc("crawler_retries_total", value=retries)
+    if fetch_latency is not None:
+        metrics.observe("crawler_fetch_seconds", fetch_latency)
+    if render_latency is not None:
+        metrics.observe("crawler_render_seconds", render_latency)
+
+#ulozi stranku len ak sa jej obsah zmenil, vrati True ak je nova alebo zmenena
+def record_page(normalized, html_source, etag=None, last_modified=None):
+    body_hash = hashlib.sha1(html_source.encode("utf-8")).hexdigest()
+    previous = frontier.validators(normalized)
+    frontier.set_validators(normalized, etag, last_modified, body_hash)
+    if previous and previous["body_hash"] == body_hash:
+        count_unchanged()
+        return False
+    save_page(normalized, html_source)
+    emit_change(normalized, "changed" if previous else "added", body_hash)
+    return True
+
+#najde v html nove odkazy v ramci domeny a vrati ich
+def find_links(normalized, html_source):
+    #najdeme vsetky odkazy na stranke
+    hrefs = HREF_RE.findall(html_source)
+    new_links = []
+
+    for href in hrefs:
+        href = html.unescape(href)
+        absolute = urljoin(normalized, href)
+        normalized_link = clean_url(absolute)
+        #ignorujeme odkazy mimo domeny
+        if not in_same_domain(normalized_link):
+            continue
+        priority = page_priority(normalized_link)
+        if priority is None:
+            continue
+        if frontier.add(normalized_link, priority):
+            new_links.append(normalized_link)
+            link_log.write(normalized_link)
+
+    return new_links
+
+
+#vrati nove linky zo stranky alebo None ak sa stranku nepodarilo stiahnut
 def extract_links(driver, page_url):
     normalized = clean_url(page_url)
+    started = time.perf_counter()
     try:
         driver.get(normalized)
         html_source = driver.page_source
+        render_latency = time.perf_counter() - started
+        record_page(normalized, html_source)
+        new_links = find_links(normalized, html_source)
+
+    except Exception as e:
+        record_fetch(normalized, "selenium", render_latency=time.perf_counter() - started, error=type(e).__name__)
+        return None
+
+    record_fetch(normalized, "selenium", 200, len(html_source.encode("utf-8")), render_latency=render_latency)
+    return new_links
+
+
+#vrati True ak staticke html zjavne potrebuje JS (ziadne odkazy alebo noscript hlaska)
+def needs_js(html_source):
+    if not HREF_RE.search(html_source):
+        return True
+    return bool(NOSCRIPT_RE.search(html_source))
+
+
+#stiahne stranku cez http, vrati (status, html, validatory, pocet opakovani)
+#html je None ak to nie je html alebo status nie je 200
+#ak pozname validatory z minula, poslu sa podmienene hlavicky a nezmenena stranka vrati 304
+async def fetch_http(session, url, validators=None):
+    headers = {"User-Agent": random.choice(USER_AGENTS)}
+    if validators:
+        if validators["etag"]:
+            headers["If-None-Match"] = validators["etag"]
+        if validators["last_modified"]:
+            headers["If-Modified-Since"] = validators["last_modified"]
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            async with session.get(url, headers=headers) as resp:
+                if resp.status >= 500 and attempt < HTTP_RETRIES:
+                    await asyncio.sleep(HTTP_RETRY_BACKOFF * 2 ** attempt)
+                    continue
+                content_type = resp.headers.get("Content-Type", "")
+                if resp.status != 200 or "html" not in content_type.lower():
+                    return resp.status, None, {}, attempt
+                received = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+                return resp.status, await resp.text(errors="replace"), received, attempt
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == HTTP_RETRIES:
+                e.retries = attempt
+                raise
+            await asyncio.sleep(HTTP_RETRY_BACKOFF * 2 ** attempt)
+
+
+#vyrenderuje stranku cez selenium, driver sa vytvori az ked je prvykrat potrebny
+def render_with_driver(fallback, url):
+    if fallback["driver"] is None:
+        fallback["driver"] = create_driver()
+    driver = fallback["driver"]
+    driver.get(url)
+    html_source = driver.page_source
+    rotate_user_agent(driver)
+    return html_source
+
+
+#asynchronny crawl cez http klienta, selenium sa pouzije len pre stranky ktore potrebuju JS
+async def crawl_http(start_url, concurrency=HTTP_CONCURRENCY, per_host=HTTP_PER_HOST, host_rate=DEFAULT_HOST_RATE):
+    frontier.add(clean_url(start_url), HUB_PRIORITY)
+    limiter = HostRateLimiter(host_rate, robots.crawl_delay)
+
+    loop = asyncio.get_running_loop()
+    #jeden driver, takze renderovanie ide cez jedno vlakno
+    render_pool = ThreadPoolExecutor(max_workers=1)
+    fallback = {"driver": None}
+    rendered = 0
+    in_flight = 0
 
-        os.makedirs("pages", exist_ok=True)
-        file_name = re.sub(r'[^A-Za-z0-9_\-\.]', '_', normalized.replace('https://', '').replace('http://', ''))
-        file_path = os.path.join("pages", f"{file_name}.html")
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(html_source)
-            
-        #najdeme vsetky odkazy na stranke
-        hrefs = re.findall(r'href=["\'](.*?)["\']', html_source, re.IGNORECASE)
-        new_links = []
-
-        for href in hrefs:
-            href = html.unescape(href)
-            absolute = urljoin(normalized, href)
-            normalized_link = clean_url(absolute)
-            #ignorujeme odkazy mimo domeny
-            if not in_same_domain(normalized_link):
+    async def visit(session, normalized):
+        nonlocal rendered
+        #kontrola podla robots.txt, prve stiahnutie robots.txt je blokujuce
+        if not await loop.run_in_executor(None, allowed_by_robots, normalized):
+            frontier.mark_failed(normalized, "robots")
+            record_fetch(normalized, "http", error="RobotsDisallowed")
+            return
+
+        status = fetch_latency = render_latency = None
+        retries = 0
+        try:
+            await limiter.wait_async(url_base(normalized))
+            started = time.perf_counter()
+            status, html_source, received, retries = await fetch_http(session, normalized, frontier.validators(normalized))
+            fetch_latency = time.perf_counter() - started
+            if status == 304:
+                #stranka sa nezmenila, linky z nej uz vo frontier su
+                count_unchanged()
+                mark_visited(normalized)
+                record_fetch(normalized, "http", status, 0, fetch_latency, retries=retries)
+                return
+            if html_source is None:
+                frontier.mark_failed(normalized, f"http {status}")
+                error = "NotHTML" if status == 200 else "HTTPStatus"
+                record_fetch(normalized, "http", status, 0, fetch_latency, retries=retries, error=error)
+                return
+            if needs_js(html_source):
+                started = time.perf_counter()
+                html_source = await loop.run_in_executor(render_pool, render_with_driver, fallback, normalized)
+                render_latency = time.perf_counter() - started
+                rendered += 1
+            record_page(normalized, html_source, received["etag"], received["last_modified"])
+            find_links(normalized, html_source)
+        except Exception as e:
+            frontier.mark_failed(normalized, type(e).__name__)
+            record_fetch(normalized, "http", status, 0, fetch_latency, render_latency,
+                         getattr(e, "retries", retries), type(e).__name__)
+            return
+
+        mark_visited(normalized)
+        record_fetch(normalized, "http", status, len(html_source.encode("utf-8")), fetch_latency, render_latency, retries)
+        print(f"\r\033[KFound: {frontier.known} | Visited: {frontier.visited} | Rendered: {rendered} | Last: {normalized}", end="", flush=True)
+
+    #worker konci az ked je fronta prazdna a ziadna stranka sa uz nestahuje
+    async def worker(session):
+        nonlocal in_flight
+        while not budget_exhausted():
+            url = frontier.pop()
+            if url is None:
+                if in_flight == 0:
+                    return
+                await asyncio.sleep(0.05)
                 continue
-            if normalized_link not in discovered_links:
-                discovered_links.add(normalized_link)
-                new_links.append(normalized_link)
-                #zapise novy link do suboru hned po objaveni
-                with open("links.txt", "a", encoding="utf-8") as lf:
-                    lf.write(f"{html.escape(normalized_link)}\n")
+            in_flight += 1
+            try:
+                await visit(session, url)
+            finally:
+                in_flight -= 1
 
-        return new_links
+    #pool spojeni s limitom na host
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            workers = [asyncio.create_task(worker(session)) for _ in range(concurrency)]
+            await asyncio.gather(*workers)
+    finally:
+        render_pool.shutdown(wait=True)
+        if fallback["driver"] is not None:
+            fallback["driver"].quit()
 
-    except Exception as e:
-        return []
 
+#globalny rozvrh requestov na jeden host, zdielany vsetkymi workermi
+#rozostup je Crawl-delay z robots.txt, s --host-rate aspon 1 / rate, bez oboch sa neobmedzuje
+class HostRateLimiter:
+    def __init__(self, rate=None, delay_of=None):
+        self.min_interval = 1.0 / rate if rate else 0.0
+        self.delay_of = delay_of
+        self.intervals = {}
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    #rozostup pre host, zisti sa raz a potom sa drzi v pamati
+    def interval(self, host):
+        interval = self.intervals.get(host)
+        if interval is None:
+            declared = self.delay_of(host) if self.delay_of else None
+            interval = max(declared or 0.0, self.min_interval)
+            self.intervals[host] = interval
+        return interval
 
-def crawl(start_url):
+    #rezervuje najblizsi volny slot pre host a vrati kolko sekund treba cakat
+    def reserve(self, host):
+        interval = self.interval(host)
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + interval
+            return slot - now
+
+    def wait(self, host):
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, host):
+        delay = self.reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+#zdielany stav workerov: kolko stranok sa prave stahuje a vytazenie kazdeho workera
+class PoolStats:
+    def __init__(self, workers):
+        self.lock = threading.Lock()
+        self.start = time.time()
+        self.in_flight = 0
+        self.busy = [0.0] * workers
+        self.pages = [0] * workers
+
+    #pop z frontier a zapocitanie do in_flight musi byt atomicke, inak by worker mohol skoncit predcasne
+    def take(self):
+        with self.lock:
+            url = frontier.pop()
+            if url is not None:
+                self.in_flight += 1
+            return url
+
+    def done(self, worker_id, busy_time):
+        with self.lock:
+            self.in_flight -= 1
+            self.busy[worker_id] += busy_time
+            self.pages[worker_id] += 1
+
+    def idle(self):
+        with self.lock:
+            return self.in_flight == 0 and len(frontier) == 0
+
+    def progress(self, normalized):
+        with self.lock:
+            elapsed = max(time.time() - self.start, 1e-6)
+            per_min = sum(self.pages) * 60.0 / elapsed
+            util = " ".join(f"{min(b / elapsed, 1.0) * 100:.0f}%" for b in self.busy)
+            print(f"\r\033[KFound: {frontier.known} | Visited: {frontier.visited} | {per_min:.1f} pages/min | Util: {util} | Last: {normalized}", end="", flush=True)
+
+
+#jeden worker s vlastnym driverom a rotaciou user-agenta
+def browser_worker(worker_id, stats, limiter):
     driver = create_driver()
     try:
-        if discovered_links:
-            to_visit = [link for link in discovered_links if link not in visited_pages]
-        else:
-            to_visit = [start_url]
-
-        #hlavny crawl cyklus
-        while to_visit:
-            current_url = to_visit.pop(0)
-            normalized = clean_url(current_url)
-            if normalized in visited_pages:
-                continue
-
-            #kontrola podla robots.txt
-            if not allowed_by_robots(normalized):
+        while not budget_exhausted():
+            normalized = stats.take()
+            if normalized is None:
+                if stats.idle():
+                    break
+                time.sleep(0.2)
                 continue
 
-            #oznacime ako navstivenu
-            visited_pages.add(normalized)
-            #ziskame nove linky zo stranky a pridame ich do fronty
-            new_links = extract_links(driver, current_url)
-            to_visit.extend(new_links)
+            started = time.time()
+            try:
+                #kontrola podla robots.txt
+                if not allowed_by_robots(normalized):
+                    frontier.mark_failed(normalized, "robots")
+                    record_fetch(normalized, "selenium", error="RobotsDisallowed")
+                    continue
 
-            #ziskame aktualny user agent
-            current_agent = driver.execute_script("return navigator.userAgent;")
-            print(f"\r\033[KFound: {len(discovered_links)} | Visited: {len(visited_pages)} | Last: {normalized} | Agent: {current_agent}", end="", flush=True)
+                limiter.wait(url_base(normalized))
+                #ziskame nove linky zo stranky, frontier ich uz ma vo fronte
+                new_links = extract_links(driver, normalized)
+                if new_links is None:
+                    frontier.mark_failed(normalized, "fetch")
+                    continue
+                #oznacime ako navstivenu
+                mark_visited(normalized)
+            finally:
+                stats.done(worker_id, time.time() - started)
 
-            time.sleep(random.uniform(1.0, 3.0))
+            stats.progress(normalized)
+            #cakanie medzi requestmi riesi HostRateLimiter podla Crawl-delay
             rotate_user_agent(driver)
     except Exception as e:
-        #print(f"\n{e}")
-        pass
+        #worker skonci, chyba sa zapise do event logu aby sa nestratila
+        metrics.inc("crawler_worker_errors_total", (("error", type(e).__name__),))
+        if events is not None:
+            events.write({"time": round(time.time(), 3), "worker": worker_id, "error": type(e).__name__, "message": str(e)})
     finally:
         driver.quit()
 
+
+def crawl(start_url, workers=1, host_rate=DEFAULT_HOST_RATE):
+    frontier.add(clean_url(start_url), HUB_PRIORITY)
+    stats = PoolStats(workers)
+    limiter = HostRateLimiter(host_rate, robots.crawl_delay)
+
+    threads = [
+        threading.Thread(target=browser_worker, args=(i, stats, limiter), daemon=True)
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawler pre whc.unesco.org")
+    parser.add_argument("--engine", choices=["selenium", "http"], default="selenium",
+                        help="selenium renderuje kazdu stranku, http stahuje asynchronne a selenium pouzije len ak treba JS")
+    parser.add_argument("--concurrency", type=int, default=HTTP_CONCURRENCY, help="pocet sucasnych requestov (http)")
+    parser.add_argument("--per-host", type=int, default=HTTP_PER_HOST, help="max sucasnych spojeni na jeden host (http)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="pocet paralelnych selenium driverov")
+    parser.add_argument("--host-rate", type=float, default=DEFAULT_HOST_RATE,
+                        help="max requestov za sekundu na jeden host (default ziadny limit, plati len Crawl-delay z robots.txt); "
+                             "ak host udava aj Crawl-delay, plati prisnejsi z oboch")
+    parser.add_argument("--robots-ttl", type=float, default=ROBOTS_TTL, help="po kolkych sekundach sa robots.txt stiahne znova")
+    parser.add_argument("--recrawl", action="store_true",
+                        help="znova skontrolovat uz navstivene stranky, ulozia sa len zmenene (zoznam v changes.jsonl)")
+    parser.add_argument("--time-budget", type=float, help="zastavit crawl po danom pocte sekund")
+    parser.add_argument("--skip-low", action="store_true",
+                        help="nepridavat do frontier stranky, ktore nie su dokumenty ani zoznamy (PRIORITY_RULES)")
+    parser.add_argument("--compact-seen", action="store_true",
+                        help="drzat videne URL ako 64-bitove odtlacky namiesto celych stringov")
+    parser.add_argument("--events", default=EVENTS_FILE, help="JSONL log s jednym riadkom na kazdy fetch")
+    parser.add_argument("--metrics-port", type=int, help="spustit lokalny /metrics endpoint na danom porte")
+    parser.add_argument("--debug", action="store_true", help="nepresmerovat stderr do /dev/null")
+    parser.add_argument("--store", default=STORE_DIR, help="adresar page store so segmentami")
+    parser.add_argument("--files", action="store_true", help="ukladat stranky po jednej do pages/ ako predtym")
+    parser.add_argument("--base-url", default=BASE_URL, help="zaciatocna URL a hranica domeny, napr. lokalna kopia stranky")
+    return parser.parse_args()
+
 def main():
-    #aby chyby nezahlcovali konzolu
-    sys.stderr = open(os.devnull, 'w')
+    global BASE_URL, frontier, page_store, link_log, skip_low, crawl_deadline, robots, events
+    args = parse_args()
+    BASE_URL = args.base_url
+    skip_low = args.skip_low
+    robots = RobotsCache(ROBOTS_CACHE, ttl=args.robots_ttl)
+    #robots.txt hlavneho hosta sa stahuje na pozadi kym sa nacitava frontier
+    robots.prefetch([url_base(BASE_URL)])
+    if not args.files:
+        page_store = PageStore(args.store)
+
+    #aby chyby nezahlcovali konzolu, chyby fetchov su v event logu
+    if not args.debug:
+        sys.stderr = open(os.devnull, 'w')
     
-    #nacitanie uz znamych linkov z links.txt
-    if os.path.exists("links.txt"):
-        with open("links.txt", "r", encoding="utf-8") as f:
-            for line in f:
-                link = line.strip()
-                if link:
-                    discovered_links.add(link)
-
-    #nacitanie uz navstivenych stranok z adresara pages/
-    if os.path.exists("pages"):
-        for filename in os.listdir("pages"):
-            if filename.endswith(".html"):
-                name = filename[:-5]  #odstrani .html
-                #nahradi _ za / a prida prefix https://
-                visited_url = "https://" + name.replace('_', '/')
-                visited_pages.add(visited_url)
+    #stav crawlu sa nacita z frontier databazy
+    load_start = time.time()
+    frontier = Frontier(FRONTIER_DB, compact=args.compact_seen)
+    if frontier.fresh:
+        #prvy beh po starej verzii, prevezmeme links.txt a uz stiahnute stranky
+        imported = frontier.import_legacy(
+            LINKS_FILE,
+            lambda link: os.path.exists(page_path(link)) or (page_store is not None and page_store.has(link)),
+            page_priority
+        )
+        if imported:
+            print(f"Imported {imported} links from {LINKS_FILE}")
+    if args.recrawl:
+        print(f"Recrawl: {frontier.requeue_visited()} visited pages queued for revalidation")
+    print(f"Frontier loaded in {(time.time() - load_start) * 1000:.1f} ms ({len(frontier)} queued, {frontier.visited} visited)")
 
+    link_log = LinkLog(LINKS_FILE)
+    events = EventLog(args.events)
+    metrics.gauge("crawler_frontier_queued", lambda: len(frontier))
+    metrics.gauge("crawler_frontier_visited", lambda: frontier.visited)
+    if args.metrics_port:
+        serve_metrics(metrics, args.metrics_port)
+        print(f"Metrics on http://127.0.0.1:{args.metrics_port}/metrics")
     start_time = time.time()
-    print("Starting crawler...")
-    crawl(BASE_URL)
+    if args.time_budget:
+        crawl_deadline = time.monotonic() + args.time_budget
+    print(f"Starting crawler ({args.engine})...")
+    if args.engine == "http":
+        asyncio.run(crawl_http(BASE_URL, args.concurrency, args.per_host, args.host_rate))
+    else:
+        crawl(BASE_URL, args.workers, args.host_rate)
     elapsed = time.time() - start_time
+    link_log.close()
+    events.close()
+    robots.close()
+    seen_mb = frontier.seen_bytes() / (1024 * 1024)
+    frontier.close()
+    if page_store is not None:
+        page_store.close()
 
     print("\n\nCrawl complete.")
-    print(f"Total unique links found: {len(discovered_links)}")
-    print(f"Pages visited: {len(visited_pages)}")
-    print("Links saved to links.txt")
+    print(f"Total unique links found: {frontier.known}")
+    print(f"Pages visited: {frontier.visited}")
+    print(f"Pages failed: {frontier.failed}")
+    fetched = sum(fetched_by_priority.values())
+    useful = fetched_by_priority[DOC_PRIORITY]
+    print(f"Useful pages (list/decisions/soc): {useful} of {fetched} fetched ({useful * 100.0 / max(fetched, 1):.1f}%)"
+          f" | hubs: {fetched_by_priority[HUB_PRIORITY]} | other: {fetched_by_priority[DEFAULT_PRIORITY]}")
+    if budget_exhausted():
+        print(f"Time budget reached, {len(frontier)} pages left in frontier")
+    print(f"Pages new: {change_counts['added']} | changed: {change_counts['changed']} | unchanged: {change_counts['unchanged']}")
+    if change_counts["added"] or change_counts["changed"]:
+        print(f"Changes saved to {CHANGES_FILE}")
+    print(f"Links saved to {LINKS_FILE}")
+    print(f"Fetch events saved to {args.events}")
+    print(f"Pages saved to {'pages/' if args.files else args.store}")
     print(f"Total runtime: {elapsed:.2f} seconds")
+    #ru_maxrss je na linuxe v KB
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Memory: seen-set {seen_mb:.1f} MB ({'fingerprints' if args.compact_seen else 'strings'}) | peak RSS {peak_mb:.1f} MB")
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#
+# Dominik Mifkovič 2025
+#
+import sys
+import math
+import heapq
+from bisect import bisect_left
+import bm25
+from binary_index import BLOCK_SIZE
+
+#document-at-a-time vyhodnotenie dopytu s block-max prerezavanim
+#postings vsetkych termov sa prechadzaju naraz podla doc_id, najvzacnejsi term urcuje kandidatov
+#a ostatne sa k nemu posuvaju cez next_geq, ktore preskakuje cele bloky podla skip tabulky
+#kazdy blok ma najvacsie tf, z neho horny odhad skore bloku; ked ani sucet odhadov vsetkych termov
+#neprekona najhorsi vysledok v halde top-k, kandidati sa preskocia az za koniec najkratsieho bloku
+#bez dekodovania a skorovania
+
+#doc_id za koncom postings
+END = sys.maxsize
+
+
+#kurzor nad postings rozdelenymi na bloky, lasts su posledne doc_id, maxes najvacsie tf
+#a impacts najvacsie BM25 impacty blokov, idf je BM25 idf termu
+#blok sa nacita az ked sa na neho kurzor posunie
+class PostingCursor:
+    def __init__(self, df, idf, lasts, maxes, impacts):
+        self.df = df
+        self.idf = idf
+        self.lasts = lasts
+        self.maxes = maxes
+        self.impacts = impacts
+        self.block = 0
+        self.docs, self.tfs = self.load(0)
+        self.pos = 0
+        self.doc = self.docs[0]
+
+    #(doc_id, tf) bloku i
+    def load(self, i):
+        raise NotImplementedError
+
+    @property
+    def tf(self):
+        return self.tfs[self.pos]
+
+    #posunie kurzor na prvy dokument s doc_id >= target
+    def next_geq(self, target):
+        if target <= self.doc:
+            return self.doc
+        if target > self.lasts[self.block]:
+            i = bisect_left(self.lasts, target, self.block + 1)
+            if i == len(self.lasts):
+                self.doc = END
+                return END
+            self.block = i
+            self.docs, self.tfs = self.load(i)
+            self.pos = 0
+        self.pos = bisect_left(self.docs, target, self.pos)
+        self.doc = self.docs[self.pos]
+        return self.doc
+
+    #blok, v ktorom by bol target, bez jeho nacitania
+    def shallow(self, target):
+        return bisect_left(self.lasts, target, self.block)
+
+    #vsetky bloky od zaciatku ako (doc_id, tf), pre term-at-a-time vyhodnotenie
+    def all_blocks(self):
+        for i in range(len(self.lasts)):
+            yield (self.docs, self.tfs) if i == self.block else self.load(i)
+
+
+#tabulka blokov postings [(doc_id, tf)] z index.jsonl, bloky rovnakej velkosti ako v binarnom indexe
+#(df, idf, doc_id, tf, posledne doc_id, najvacsie tf, impacty blokov alebo None), search.py ju drzi v LRU cache
+#a kurzory nad nou sa pri dalsich dopytoch vytvaraju bez prechodu postings
+def list_blocks(postings, idf=None):
+    docs = [p[0] for p in postings]
+    tfs = [p[1] for p in postings]
+    lasts = docs[BLOCK_SIZE - 1::BLOCK_SIZE]
+    if len(postings) % BLOCK_SIZE:
+        lasts.append(docs[-1])
+    maxes = [max(tfs[i:i + BLOCK_SIZE]) for i in range(0, len(postings), BLOCK_SIZE)]
+    return len(postings), idf, docs, tfs, lasts, maxes, None
+
+#tabulka blokov s najvacsimi BM25 impactmi blokov podla noriem dokumentov
+#term s jednym blokom ma impact bloku rovny max_impact z indexu, inak sa impacty spocitaju raz pre cely term
+def with_impacts(blocks, norms, max_impact=None):
+    df, idf, docs, tfs, lasts, maxes, impacts = blocks
+    if impacts is not None:
+        return blocks
+    if len(lasts) == 1 and max_impact is not None:
+        impacts = [max_impact]
+    else:
+        impacts = [
+            max(map(bm25.impact, tfs[i:i + BLOCK_SIZE], [norms[doc_id] for doc_id in docs[i:i + BLOCK_SIZE]]))
+            for i in range(0, df, BLOCK_SIZE)
+        ]
+    return df, idf, docs, tfs, lasts, maxes, impacts
+
+#kurzor nad tabulkou z list_blocks
+class ListCursor(PostingCursor):
+    def __init__(self, blocks):
+        df, idf, self.all_docs, self.all_tfs, lasts, maxes, impacts = blocks
+        super().__init__(df, idf, lasts, maxes, impacts)
+
+    def load(self, i):
+        start = i * BLOCK_SIZE
+        return self.all_docs[start:start + BLOCK_SIZE], self.all_tfs[start:start + BLOCK_SIZE]
+
+
+#postings z binary_index, bloky sa dekoduju priamo z mmap
+class BinaryCursor(PostingCursor):
+    def __init__(self, index, blocks):
+        self.index = index
+        df, idf, self.offset, lasts, self.ends, maxes, impacts = blocks
+        super().__init__(df, idf, lasts, maxes, impacts)
+
+    def load(self, i):
+        start = self.ends[i - 1] if i else 0
+        base = self.lasts[i - 1] if i else 0
+        return self.index.read_block(self.offset, start, self.ends[i], base)
+
+
+#term dopytu: kurzor, idf a horne odhady skore pre kazdy blok
+#skore je (1 + log tf) * idf, pri idf >= 0 rastie s tf, takze najvacsie tf bloku dava jeho horny odhad
+class QueryTerm:
+    def __init__(self, cursor, idf):
+        self.cursor = cursor
+        self.df = cursor.df
+        self.idf = idf
+        #tf -> skore, tie iste tf sa opakuju
+        self.scores = {}
+        self.bounds = [self.score(tf) for tf in cursor.maxes]
+        self.max_bound = max(self.bounds)
+
+    def score(self, tf, doc_id=None):
+        value = self.scores.get(tf)
+        if value is None:
+            value = self.scores[tf] = (1 + math.log(tf)) * self.idf
+        return value
+
+#BM25 term: skore je idf * impact(tf, norma dokumentu), horne odhady blokov su idf * najvacsi impact bloku
+#impacty blokov su spocitane tou istou funkciou, takze odhad je presne skore najlepsieho postingu bloku
+class BM25Term(QueryTerm):
+    def __init__(self, cursor, norms):
+        self.cursor = cursor
+        self.df = cursor.df
+        self.idf = cursor.idf
+        self.norms = norms
+        self.bounds = [self.idf * impact for impact in cursor.impacts]
+        self.max_bound = max(self.bounds)
+
+    def score(self, tf, doc_id=None):
+        return self.idf * bm25.impact(tf, self.norms[doc_id])
+
+
+#top-k dokumentov obsahujucich vsetky termy ako [(doc_id, skore)] zoradene podla skore
+#pri rovnakom skore vyhrava mensie doc_id
+#skore aj odhady sa scitavaju v poradi termov dopytu, takze odhad nikdy nie je mensi nez skutocne skore
+def top_k_and(terms, k):
+    if not terms or k <= 0:
+        return []
+    lead = min(terms, key=lambda t: t.df)
+    lead_cursor = lead.cursor
+    rest = [t.cursor for t in terms if t is not lead]
+    total_bound = sum(t.max_bound for t in terms)
+
+    #min-halda (skore, -doc_id), na vrchu je najhorsi vysledok
+    heap = []
+    threshold = -math.inf
+    d = lead_cursor.doc
+    while d != END:
+        if len(heap) == k:
+            if total_bound <= threshold:
+                break
+            #odhad pre cely usek az po koniec najkratsieho bloku a odhad len pre d,
+            #kde je namiesto bloku vedeceho termu jeho presne skore
+            block_bound = doc_bound = 0.0
+            end = END
+            for t in terms:
+                cursor = t.cursor
+                i = cursor.shallow(d)
+                if i == len(cursor.lasts):
+                    end = None
+                    break
+                bound = t.bounds[i]
+                block_bound += bound
+                doc_bound += t.score(cursor.tf, d) if t is lead else bound
+                if cursor.lasts[i] < end:
+                    end = cursor.lasts[i]
+            if end is None:
+                break
+            if block_bound <= threshold:
+                d = lead_cursor.next_geq(end + 1)
+                continue
+            if doc_bound <= threshold:
+                d = lead_cursor.next_geq(d + 1)
+                continue
+
+        for cursor in rest:
+            doc = cursor.next_geq(d)
+            if doc != d:
+                d = lead_cursor.next_geq(doc)
+                break
+        else:
+            item = (sum(t.score(t.cursor.tf, d) for t in terms), -d)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+            if len(heap) == k:
+                threshold = heap[0][0]
+            d = lead_cursor.next_geq(d + 1)
+
+    return [(-neg_doc, score) for score, neg_doc in sorted(heap, reverse=True)]
@@ -1,3 +1,4 @@
+import os
 import re
 import urllib.parse
 from pyspark.sql import SparkSession
@@ -10,6 +11,8 @@ from pyspark.sql.window import Window
 
 WIKI_XML   = "enwiki-latest-pages-articles.xml"
 PAGES_JSON = "pages.jsonl"
+#Parquet z extractor_par.py --parquet, particie type=list_property/decision/soc
+PAGES_PARQUET = "pages_parquet"
 OUT_DIR    = "./join_out"
 
 RE_TITLE = re.compile(r"<title>(.*?)</title>", re.DOTALL)
@@ -541,7 +544,16 @@ if __name__ == "__main__":
         .drop("rn", "rank_score")
     )
 
-    pages_df = spark.read.json(PAGES_JSON)
+    #typovany Parquet ma explicitnu schemu, filter na type precita len particiu list_property
+    #stare pages.jsonl bez aktualneho Parquet sa cita ako predtym
+    use_parquet = os.path.isdir(PAGES_PARQUET)
+    if use_parquet:
+        from columnar import is_fresh
+        use_parquet = is_fresh(PAGES_PARQUET, PAGES_JSON)
+    if use_parquet:
+        pages_df = spark.read.option("mergeSchema", "true").parquet(PAGES_PARQUET).drop("doc_id")
+    else:
+        pages_df = spark.read.json(PAGES_JSON)
 
     list_df = (
         pages_df
@@ -0,0 +1,89 @@
+#
+# Dominik Mifkovič 2025
+#
+import json
+import time
+import sqlite3
+
+MANIFEST_DB = "extract_manifest.db"
+#po kolkych zmenach sa robi commit
+COMMIT_EVERY = 1000
+
+#manifest inkrementalnej extrakcie: zdroj (cesta k suboru alebo URL v page store) -> velkost, mtime,
+#hash obsahu, verzia extraktora a dokument, ktory z neho vznikol (NULL ak z neho dokument nevznikol)
+#z manifestu sa da pages.jsonl poskladat bez toho, aby sa nezmenene stranky znova spracovali
+class ExtractManifest:
+    def __init__(self, path=MANIFEST_DB):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "source TEXT PRIMARY KEY, url TEXT, size INTEGER, mtime INTEGER, hash TEXT, version INTEGER, "
+            "doc TEXT, updated REAL)"
+        )
+        self.db.commit()
+        self.pending = 0
+        #stav vsetkych zdrojov v pamati, aby kontrola nezmenenych stranok nerobila dotaz na kazdu
+        self.entries = {
+            source: (size, mtime, digest, version)
+            for source, size, mtime, digest, version in self.db.execute(
+                "SELECT source, size, mtime, hash, version FROM sources"
+            )
+        }
+
+    def __contains__(self, source):
+        return source in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    #(size, mtime, hash, version) alebo None
+    def get(self, source):
+        return self.entries.get(source)
+
+    def sources(self):
+        return list(self.entries)
+
+    #dokument zo zdroja alebo None
+    def doc(self, source):
+        row = self.db.execute("SELECT doc FROM sources WHERE source = ?", (source,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    #obsah sa nezmenil, len subor dostal novy mtime
+    def touch(self, source, size, mtime):
+        _, _, digest, version = self.entries[source]
+        self.entries[source] = (size, mtime, digest, version)
+        self.db.execute("UPDATE sources SET size = ?, mtime = ? WHERE source = ?", (size, mtime, source))
+        self._changed()
+
+    def put(self, source, url, size, mtime, digest, version, doc):
+        self.entries[source] = (size, mtime, digest, version)
+        self.db.execute(
+            "INSERT OR REPLACE INTO sources (source, url, size, mtime, hash, version, doc, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (source, url, size, mtime, digest, version,
+             json.dumps(doc, ensure_ascii=False) if doc else None, time.time())
+        )
+        self._changed()
+
+    def remove(self, source):
+        self.entries.pop(source, None)
+        self.db.execute("DELETE FROM sources WHERE source = ?", (source,))
+        self._changed()
+
+    #dokumenty zadanych zdrojov ako JSON riadky v ich poradi, zdroje bez dokumentu sa preskocia
+    def doc_lines(self, sources):
+        for source in sources:
+            row = self.db.execute("SELECT doc FROM sources WHERE source = ?", (source,)).fetchone()
+            if row and row[0]:
+                yield row[0] + "\n"
+
+    def _changed(self):
+        self.pending += 1
+        if self.pending >= COMMIT_EVERY:
+            self.db.commit()
+            self.pending = 0
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
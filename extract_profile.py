@@ -0,0 +1,101 @@
+#
+# Dominik Mifkovič 2025
+#
+import json
+import math
+import heapq
+from collections import defaultdict
+
+PROFILE_FILE = "extract_profile.json"
+SLOWEST_PAGES = 20
+PERCENTILES = (50, 90, 99)
+
+#percentil metodou najblizsieho poradia zo zoradeneho zoznamu
+def percentile(values, q):
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+def summarize(values):
+    values = sorted(values)
+    out = {"count": len(values), "total": sum(values)}
+    for q in PERCENTILES:
+        out[f"p{q}"] = percentile(values, q)
+    out["max"] = values[-1] if values else 0.0
+    return out
+
+
+#casy extrakcie zozbierane zo vsetkych workerov
+#worker posiela pre kazdu stranku zaznam {url, type, size, seconds, fields}, kde fields su casy krokov
+#(citanie, priprava html a jednotlive polia PageSpec), hlavny proces ich tu spaja
+class ExtractProfile:
+    def __init__(self, slowest=SLOWEST_PAGES):
+        self.slowest = slowest
+        #typ -> casy stranok
+        self.pages = defaultdict(list)
+        #typ -> pole -> casy
+        self.fields = defaultdict(lambda: defaultdict(list))
+        self.sizes = defaultdict(int)
+        #min-heap najpomalsich stranok
+        self.slow = []
+        self.failed = []
+
+    def add(self, record):
+        doc_type = record["type"]
+        self.pages[doc_type].append(record["seconds"])
+        self.sizes[doc_type] += record["size"]
+        for field, spent in record["fields"].items():
+            self.fields[doc_type][field].append(spent)
+        item = (record["seconds"], record["url"], doc_type, record["size"])
+        if len(self.slow) < self.slowest:
+            heapq.heappush(self.slow, item)
+        elif item > self.slow[0]:
+            heapq.heapreplace(self.slow, item)
+
+    #stranka, z ktorej worker zaznam neposlal (timeout alebo pad workera)
+    def add_failed(self, url, doc_type, msg):
+        self.failed.append({"url": url, "type": doc_type, "error": msg})
+
+    def report(self):
+        types = {}
+        for doc_type, seconds in sorted(self.pages.items()):
+            stats = summarize(seconds)
+            stats["bytes"] = self.sizes[doc_type]
+            total = stats["total"] or 1.0
+            fields = {}
+            for field, spent in self.fields[doc_type].items():
+                fields[field] = summarize(spent)
+                fields[field]["share"] = fields[field]["total"] / total
+            stats["fields"] = dict(sorted(fields.items(), key=lambda kv: -kv[1]["total"]))
+            types[doc_type] = stats
+        slowest = [
+            {"url": url, "type": doc_type, "size": size, "seconds": seconds}
+            for seconds, url, doc_type, size in sorted(self.slow, reverse=True)
+        ]
+        return {"types": types, "slowest": slowest, "failed": self.failed}
+
+    def write(self, path=PROFILE_FILE):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+    #textovy prehlad na konzolu
+    def lines(self):
+        report = self.report()
+        out = []
+        heads = " ".join(f"{'p' + str(q):>8s}" for q in PERCENTILES)
+        for doc_type, stats in report["types"].items():
+            pcts = " ".join(f"{stats['p' + str(q)] * 1000:6.1f}ms" for q in PERCENTILES)
+            out.append(f"{doc_type}: {stats['count']} pages, {stats['bytes'] / 1024 / 1024:.1f} MB, "
+                       f"total {stats['total']:.2f}s | {pcts} | max {stats['max'] * 1000:.1f}ms")
+            if stats["fields"]:
+                out.append(f"  {'step':22s} {'share':>6s} {heads} {'max':>8s}")
+            for field, fs in stats["fields"].items():
+                pcts = " ".join(f"{fs['p' + str(q)] * 1000:6.2f}ms" for q in PERCENTILES)
+                out.append(f"  {field:22s} {fs['share'] * 100:5.1f}% {pcts} {fs['max'] * 1000:6.2f}ms")
+        if report["slowest"]:
+            out.append(f"Slowest {len(report['slowest'])} pages:")
+            for page in report["slowest"]:
+                out.append(f"  {page['seconds'] * 1000:8.1f}ms {page['size'] / 1024:8.1f} KB  {page['type']:14s} {page['url']}")
+        for page in report["failed"]:
+            out.append(f"  [FAILED] {page['type']:14s} {page['url']}: {page['error']}")
+        return out
@@ -5,28 +5,101 @@ import os
 import re
 import json
 import html
+import time
+import hashlib
+import argparse
 import multiprocessing
-from multiprocessing import Pool, cpu_count
+from collections import Counter, deque
+from itertools import islice
+from multiprocessing import Pipe, Process, cpu_count
+from multiprocessing.connection import wait
+from page_store import PageStore, SegmentReader, page_file_name
+from extract_manifest import ExtractManifest, MANIFEST_DB
+from extract_profile import ExtractProfile, PROFILE_FILE, SLOWEST_PAGES
 
 SRC_DIR = "pages_filtered"
 OUT_FILE = "pages.jsonl"
+#pridane, zmenene a odstranene dokumenty z posledneho inkrementalneho behu
+DELTA_FILE = "pages.delta.jsonl"
+#stranky vyhodene predfiltrom ako duplikaty a stranka, ktorej su duplikatom
+DUPLICATES_FILE = "pages.duplicates.jsonl"
+#zvysit pri kazdej zmene extrakcie, inkrementalny beh potom spracuje vsetky stranky znova
+EXTRACTOR_VERSION = 1
 TIMEOUT_SEC = 10
+DEFAULT_WORKERS = min(4, cpu_count())
+#kolko stranok dostane worker naraz, vysledky posiela po jednom
+CHUNK_SIZE = 16
+#worker sa po tolkych strankach vymeni za novy, aby nerastla pamat
+MAX_TASKS_PER_WORKER = 200
+#po kolkych dokumentoch sa zapisuje do vystupu
+WRITE_BATCH = 200
+
+#reader segmentov, kazdy worker si ho otvori sam
+segment_reader = None
 
 MAIN_LIST_URL_RE = re.compile(r"^https://whc\.unesco\.org/en/list/(\d+)/?$", re.I)
 DECISION_URL_RE = re.compile(r"^https://whc\.unesco\.org/en/decisions/(\d+)/?$", re.I)
 SOC_URL_RE = re.compile(r"^https://whc\.unesco\.org/en/soc/(\d+)/?$", re.I)
 
 
+#predkompilovane regexy, kompiluju sa raz pri importe v kazdom workeri
+NOISE_RE = re.compile(r"(?is)<(script|style|header|footer|nav)[^>]*>.*?</\1>")
+COMMENT_RE = re.compile(r"(?is)<!--.*?-->")
+NOT_FOUND_RE = re.compile(r"(?is)<h1[^>]*>\s*404\s*</h1>")
+MARKUP_RE = re.compile(r"(?s)<[^>]+>")
+TITLE_RE = re.compile(r"(?is)<title[^>]*>(.*?)</title>")
+H1_RE = re.compile(r"(?is)<h1[^>]*>(.*?)</h1>")
+PARAGRAPH_RE = re.compile(r"(?is)<p[^>]*>(.*?)</p>")
+TEXT_ELEMENT_RE = re.compile(r"(?is)<(h[1-5]|p|li)[^>]*>(.*?)</\1>")
+DESCRIPTION_RE = re.compile(r'(?is)<div[^>]*class="[^"]*\bdescription\b[^"]*"[^>]*>(.*?)</div>')
+STATES_LINK_RE = re.compile(r'<a[^>]+href="[^"]*/statesparties/[^"]*"[^>]*>(.*?)</a>', re.I)
+PROPERTY_LINK_RE = re.compile(r'<a[^>]+href="[^"]*/list/[^"]*"[^>]*>(.*?)</a>', re.I)
+SOC_LINK_RE = re.compile(r'<a[^>]+href="[^"]*/soc/(\d+)/"[^>]*>(.*?)</a>', re.I)
+LIST_LINK_RE = re.compile(r"/en/list/(\d+)/?")
+
+REGION_RE = re.compile(r"Region:</b>\s*([^<]+)", re.I)
+CATEGORY_RE = re.compile(r"(?:Property type|Category):</b>\s*([^<]+)", re.I)
+INSCRIBED_RE = re.compile(r"Inscribed\s+in\s+(19|20)\d{2}", re.I)
+AREA_RE = re.compile(r"\b([\d.,]+)\s*ha\b", re.I)
+COORDS_RE = re.compile(r"([-+]?\d{1,2}\.\d+)\s*[,;]\s*([-+]?\d{1,3}\.\d+)")
+
+CODE_RE = re.compile(r"\b\d+\s*(?:COM|EXTCOM|BUR)\s*[0-9A-Za-z.\-]+", re.I)
+DECISION_CODE_RE = re.compile(r"Decision\s+(\d+\s*(?:COM|EXTCOM|BUR)\s*[0-9A-Za-z.\-]+)", re.I)
+SESSION_CODE_RE = re.compile(r"\b(\d+)\s*(COM|EXTCOM|BUR)\b", re.I)
+YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
+YEAR_LABEL_RE = re.compile(r'(?is)<div[^>]*>\s*Year\s*</div>.*?<a[^>]*>(19\d{2}|20\d{2})</a>')
+THEMES_RE = re.compile(r'(?is)<div[^>]*>\s*Themes\s*</div>\s*<[^>]*class="[^"]*tag[^"]*"[^>]*>(.*?)</')
+FOCAL_POINT_RE = re.compile(r'(?is)<div[^>]*>\s*Focal Point\s*</div>\s*<[^>]*class="[^"]*tag[^"]*"[^>]*>(.*?)</')
+SESSION_RE = re.compile(r'(?is)<div[^>]*>\s*Session\s*</div>\s*<a[^>]*>(.*?)</a>')
+THEMES_SPLIT_RE = re.compile(r"[,;]\s*")
+
+#odstrani sa vsetko pod nadpisom "Decisions adopted by the Committee" lebo obsahuje irelevantne info o inych pamiatkach
+#inak by to davalo irelevantne vysledky pri vyhladavani
+#napriklad ked som hladal bardejov tak to naslo boliviu lebo sa tam na spodku spominal :DDD
+DECISIONS_HDR_RE = re.compile(
+    r'(?is)<h[1-6][^>]*>\s*Decisions\s+adopted\s+by\s+the\s+Committee(?:\s+in\s+\d{4})?\s*</h[1-6]>'
+)
+SOC_YEAR_RE = re.compile(r"\bSOC\s*(19|20)\d{2}\b", re.I)
+ANY_YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+YEAR_DIGITS_RE = re.compile(r"(19|20)\d{2}")
+
+
 def filename_to_url(filename):
     name = os.path.splitext(filename)[0]
     return "https://" + name.replace("_", "/")
 
 def is_not_found(html_src):
-    return bool(re.search(r"(?is)<h1[^>]*>\s*404\s*</h1>", html_src))
+    return bool(NOT_FOUND_RE.search(html_src))
 
+#text bez tagov sa nemusi prechadzat regexom
 def clean_text(s):
-    s = re.sub(r"(?s)<[^>]+>", " ", s)
-    return " ".join(s.split()).strip()
+    if "<" in s:
+        s = MARKUP_RE.sub(" ", s)
+    return " ".join(s.split())
+
+#html bez script/style/header/footer/nav a komentarov
+def strip_noise(html_content):
+    return COMMENT_RE.sub(" ", NOISE_RE.sub(" ", html_content))
 
 #nechcene labely
 SECTION_LABELS = {
@@ -41,26 +114,108 @@ STATE_JUNK = {
 }
 
 ROMAN_GROUP = r"(?:i|ii|iii|iv|v|vi|vii|viii|ix|x)"
+CRITERIA_RE = re.compile(rf"\(({ROMAN_GROUP})\)", re.I)
 
-#list
-def extract_list_page(html_content, url):
-    html_min = re.sub(r"(?is)<(script|style|header|footer|nav)[^>]*>.*?</\1>", " ", html_content)
-    html_min = re.sub(r"(?is)<!--.*?-->", " ", html_min)
-
-    m = MAIN_LIST_URL_RE.match(url)
-    property_id = int(m.group(1)) if m else None
-
-    t = re.search(r"(?is)<title[^>]*>(.*?)</title>", html_min)
-    title = html.unescape(t.group(1).strip()) if t else ""
+#text z nadpisov, odstavcov a poloziek zoznamov bez labelov a duplicit, rovnaky pre vsetky typy stranok
+def collect_text(html_min, junk=frozenset()):
+    seen = set()
+    text_list = []
+    for tag, inner in TEXT_ELEMENT_RE.findall(html_min):
+        s = clean_text(inner)
+        if not s:
+            continue
+        low = s.lower().strip(" :·")
+        if low in SECTION_LABELS or low in junk or low.endswith(":"):
+            continue
+        if tag.startswith("h") and len(s.split()) <= 2:
+            continue
+        if s not in seen:
+            seen.add(s)
+            text_list.append(s)
+    return html.unescape(" ".join(text_list))
+
+
+#stranka pocas extrakcie, polia mozu citat uz vytiahnute hodnoty z doc
+class Page:
+    def __init__(self, url, html_min):
+        self.url = url
+        self.html = html_min
+        self.doc = {}
+
+
+#jedno pole dokumentu: pattern sa pusti na zdroj (html, url alebo skorsie pole) a post z vysledku vyrobi hodnotu
+#bez patternu dostane post celu Page, pri findall dostane zoznam, inak match (ak nic nenajde, pole ma hodnotu default)
+class Field:
+    def __init__(self, name, pattern=None, post=None, source="html", findall=False, default=None):
+        self.name = name
+        self.pattern = pattern
+        self.post = post
+        self.source = source
+        self.findall = findall
+        self.default = default
+
+    def extract(self, page):
+        if self.pattern is None:
+            return self.post(page)
+        if self.source == "html":
+            text = page.html
+        elif self.source == "url":
+            text = page.url
+        else:
+            text = page.doc.get(self.source) or ""
+        if self.findall:
+            return self.post(self.pattern.findall(text))
+        m = self.pattern.search(text)
+        if m is None:
+            return self.default
+        return self.post(m) if self.post else m.group(1)
+
+
+#typ stranky: podla url_re sa vyberie, polia sa vyhodnocuju v poradi a v tom poradi su aj v dokumente
+#prepare moze upravit html po odstraneni script/style/... (napr. orezat koniec stranky)
+class PageSpec:
+    def __init__(self, doc_type, url_re, fields, prepare=None):
+        self.type = doc_type
+        self.url_re = url_re
+        self.fields = fields
+        self.prepare = prepare
+
+    #ak su zadane timings, pripocita do nich cas kazdeho pola
+    def extract(self, html_content, url, timings=None):
+        clock = time.perf_counter if timings is not None else None
+        if clock:
+            started = clock()
+        html_min = strip_noise(html_content)
+        if self.prepare:
+            html_min = self.prepare(html_min)
+        page = Page(url, html_min)
+        page.doc = {"url": url, "type": self.type}
+        if clock:
+            timings["(prepare)"] += clock() - started
+        for field in self.fields:
+            if clock:
+                started = clock()
+            page.doc[field.name] = field.extract(page)
+            if clock:
+                timings[field.name] += clock() - started
+        return {k: v for k, v in page.doc.items() if v is not None}
+
+
+def page_id(m):
+    return int(m.group(1))
+
+def page_title(m):
+    return html.unescape(m.group(1).strip())
+
+def cleaned(m):
+    return clean_text(m.group(1)) or None
 
-    desc = re.search(r'(?is)<div[^>]*class="[^"]*\bdescription\b[^"]*"[^>]*>(.*?)</div>', html_min)
-    description = clean_text(desc.group(1)) if desc else ""
+#list
 
-    #state parties
-    state_raw = re.findall(r'<a[^>]+href="[^"]*/statesparties/[^"]*"[^>]*>(.*?)</a>', html_min, re.I)
+def list_states(found):
     states = []
     seen_states = set()
-    for s in state_raw:
+    for s in found:
         txt = clean_text(s)
         low = txt.lower()
         if not txt or low in STATE_JUNK or low.endswith(":"):
@@ -68,342 +223,672 @@ def extract_list_page(html_content, url):
         if txt not in seen_states:
             seen_states.add(txt)
             states.append(txt)
-    if states:
-        states.sort()
-
-    #region
-    region = ""
-    m = re.search(r"Region:</b>\s*([^<]+)", html_min, re.I)
-    if m:
-        region = clean_text(m.group(1))
+    return sorted(states) or None
 
-    #category
-    category = ""
-    m = re.search(r"(?:Property type|Category):</b>\s*([^<]+)", html_min, re.I)
-    if m:
-        category = clean_text(m.group(1))
-
-    #criteria
-    crits = sorted({c.lower() for c in re.findall(rf"\(({ROMAN_GROUP})\)", html_min, re.I)})
-
-    #year
-    inscription_year = None
-    m = re.search(r"Inscribed\s+in\s+(19|20)\d{2}", html_min, re.I)
-    if m:
-        inscription_year = int(m.group(0).split()[-1])
+def area(m):
+    val = m.group(1).replace(" ", "").replace(",", ".")
+    try:
+        return float(val)
+    except ValueError:
+        return None
+
+LIST_SPEC = PageSpec("list_property", MAIN_LIST_URL_RE, [
+    Field("property_id", MAIN_LIST_URL_RE, page_id, source="url"),
+    Field("title", TITLE_RE, page_title, default=""),
+    Field("description", DESCRIPTION_RE, cleaned),
+    Field("state_parties", STATES_LINK_RE, list_states, findall=True),
+    Field("region", REGION_RE, cleaned),
+    Field("category", CATEGORY_RE, cleaned),
+    Field("criteria", CRITERIA_RE, lambda found: sorted({c.lower() for c in found}) or None, findall=True),
+    Field("inscription_year", INSCRIBED_RE, lambda m: int(m.group(0).split()[-1])),
+    Field("area_hectares", AREA_RE, area),
+    Field("coordinates", COORDS_RE, lambda m: {"lat": float(m.group(1)), "lon": float(m.group(2))}),
+    Field("text", post=lambda page: collect_text(page.html, STATE_JUNK))
+])
 
-    #area
-    area_hectares = None
-    m = re.search(r"\b([\d.,]+)\s*ha\b", html_min, re.I)
-    if m:
-        val = m.group(1).replace(" ", "").replace(",", ".")
-        try:
-            area_hectares = float(val)
-        except:
-            pass
+#decisions
 
-    #coords
-    coordinates = None
-    m = re.search(r"([-+]?\d{1,2}\.\d+)\s*[,;]\s*([-+]?\d{1,3}\.\d+)", html_min)
+def decision_code(page):
+    m = CODE_RE.search(page.doc["title"])
     if m:
-        try:
-            coordinates = {"lat": float(m.group(1)), "lon": float(m.group(2))}
-        except:
-            pass
-
-    #text
-    parts = re.findall(r"(?is)<(h[1-5]|p|li)[^>]*>(.*?)</\1>", html_min)
-    seen = set()
-    text_list = []
-    for tag, inner in parts:
-        s = clean_text(inner)
-        if not s:
-            continue
-        low = s.lower().strip(" :·")
-        if low in SECTION_LABELS or low in STATE_JUNK or low.endswith(":"):
-            continue
-        if tag.startswith("h") and (low in SECTION_LABELS or len(s.split()) <= 2):
-            continue
-        if s not in seen:
-            seen.add(s)
-            text_list.append(s)
-
-    text = html.unescape(" ".join(text_list))
-
-    doc = {
-        "url": url,
-        "type": "list_property",
-        "property_id": property_id,
-        "title": title,
-        "description": description or None,
-        "state_parties": states or None,
-        "region": region or None,
-        "category": category or None,
-        "criteria": crits or None,
-        "inscription_year": inscription_year,
-        "area_hectares": area_hectares,
-        "coordinates": coordinates,
-        "text": text
-    }
-    return {k: v for k, v in doc.items() if v is not None}
-
-#decisions
-def extract_decision_page(html_content, url):
-    html_min = re.sub(r"(?is)<(script|style|header|footer|nav)[^>]*>.*?</\1>", " ", html_content)
-    html_min = re.sub(r"(?is)<!--.*?-->", " ", html_min)
-
-    m = DECISION_URL_RE.match(url)
-    decision_id = int(m.group(1)) if m else None
-
-    #title
-    t = re.search(r"(?is)<title[^>]*>(.*?)</title>", html_min)
-    title = html.unescape(t.group(1).strip()) if t else ""
-
-    #decision code
-    code = None
-    m = re.search(r"\b\d+\s*(?:COM|EXTCOM|BUR)\s*[0-9A-Za-z.\-]+", title, re.I)
-    if not m:
-        m = re.search(r"Decision\s+(\d+\s*(?:COM|EXTCOM|BUR)\s*[0-9A-Za-z.\-]+)", html_min, re.I)
-        code = clean_text(m.group(1)) if m else None
-    else:
-        code = clean_text(m.group(0))
-
-    #session code
-    session_code = None
-    if code:
-        ms = re.search(r"\b(\d+)\s*(COM|EXTCOM|BUR)\b", code, re.I)
-        if ms:
-            session_code = f"{ms.group(1)}{ms.group(2).upper()}"
-
-    #related property
-    prop_id = None
-    mp = re.search(r"/en/list/(\d+)/?", html_min)
-    if mp:
-        prop_id = int(mp.group(1))
-
-    #year
-    year = None
-    candidates = []
-    for y in re.findall(r"\b(19\d{2}|20\d{2})\b", title):
-        candidates.append(int(y))
-    intro_ps = re.findall(r"(?is)<p[^>]*>(.*?)</p>", html_min)[:3]
-    for p in intro_ps:
-        for y in re.findall(r"\b(19\d{2}|20\d{2})\b", p):
-            candidates.append(int(y))
-    m_year = re.search(r'(?is)<div[^>]*>\s*Year\s*</div>.*?<a[^>]*>(19\d{2}|20\d{2})</a>', html_min)
+        return clean_text(m.group(0)) or None
+    m = DECISION_CODE_RE.search(page.html)
+    if m is None:
+        return None
+    return clean_text(m.group(1)) or None
+
+def decision_year(page):
+    candidates = [int(y) for y in YEAR_RE.findall(page.doc["title"])]
+    #staci prve tri odstavce, finditer nemusi prejst celu stranku
+    for p in islice(PARAGRAPH_RE.finditer(page.html), 3):
+        candidates.extend(int(y) for y in YEAR_RE.findall(p.group(1)))
+    m_year = YEAR_LABEL_RE.search(page.html)
     if m_year:
         candidates.append(int(m_year.group(1)))
     candidates = [y for y in candidates if 1973 <= y <= 2100]
-    if candidates:
-        year = max(candidates)
+    return max(candidates) if candidates else None
+
+def link_names(found):
+    return sorted({clean_text(s) for s in found if s.strip()}) if found else None
+
+DECISION_SPEC = PageSpec("decision", DECISION_URL_RE, [
+    Field("decision_id", DECISION_URL_RE, page_id, source="url"),
+    Field("title", TITLE_RE, page_title, default=""),
+    Field("decision_code", post=decision_code),
+    Field("session_code", SESSION_CODE_RE, lambda m: f"{m.group(1)}{m.group(2).upper()}", source="decision_code"),
+    Field("year", post=decision_year),
+    Field("related_property_id", LIST_LINK_RE, page_id),
+    Field("text", post=lambda page: collect_text(page.html)),
+    Field("themes", THEMES_RE, lambda m: [clean_text(x) for x in THEMES_SPLIT_RE.split(m.group(1)) if x.strip()]),
+    Field("focal_point", FOCAL_POINT_RE, lambda m: clean_text(m.group(1))),
+    Field("states_parties", STATES_LINK_RE, link_names, findall=True),
+    Field("properties", PROPERTY_LINK_RE, link_names, findall=True),
+    Field("session_name", SESSION_RE, lambda m: clean_text(m.group(1))),
+    Field("soc_reports", SOC_LINK_RE,
+          lambda found: [{"soc_id": int(i), "title": clean_text(t)} for i, t in found] or None, findall=True)
+])
+
+#soc
+
+def cut_decisions(html_min):
+    m_dec = DECISIONS_HDR_RE.search(html_min)
+    return html_min[:m_dec.start()] if m_dec else html_min
+
+def soc_year(page):
+    my = SOC_YEAR_RE.search(page.doc["title"])
+    if not my:
+        my = ANY_YEAR_RE.search(page.doc["title"]) or ANY_YEAR_RE.search(page.html)
+    return int(YEAR_DIGITS_RE.search(my.group(0)).group(0)) if my else None
+
+def soc_summary(page):
+    for p in PARAGRAPH_RE.finditer(page.html):
+        s = clean_text(p.group(1))
+        if s and len(s.split()) > 8:
+            return s
+    return None
+
+SOC_SPEC = PageSpec("soc", SOC_URL_RE, [
+    Field("soc_id", SOC_URL_RE, page_id, source="url"),
+    Field("title", TITLE_RE, page_title, default=""),
+    Field("year", post=soc_year),
+    Field("related_property_id", LIST_LINK_RE, page_id),
+    Field("site_name", H1_RE, cleaned),
+    Field("summary", post=soc_summary),
+    Field("text", post=lambda page: collect_text(page.html))
+], prepare=cut_decisions)
+
+#novy typ stranky staci pridat sem
+PAGE_SPECS = [LIST_SPEC, DECISION_SPEC, SOC_SPEC]
 
-    meta = {}
+def extract_list_page(html_content, url):
+    return LIST_SPEC.extract(html_content, url)
 
-    #themes
-    m = re.search(r'(?is)<div[^>]*>\s*Themes\s*</div>\s*<[^>]*class="[^"]*tag[^"]*"[^>]*>(.*?)</', html_min)
-    if m:
-        meta["themes"] = [clean_text(x) for x in re.split(r"[,;]\s*", m.group(1)) if x.strip()]
+def extract_decision_page(html_content, url):
+    return DECISION_SPEC.extract(html_content, url)
 
-    #focal point
-    m = re.search(r'(?is)<div[^>]*>\s*Focal Point\s*</div>\s*<[^>]*class="[^"]*tag[^"]*"[^>]*>(.*?)</', html_min)
-    if m:
-        meta["focal_point"] = clean_text(m.group(1))
+def extract_soc_page(html_content, url):
+    return SOC_SPEC.extract(html_content, url)
 
-    #states parties
-    states = re.findall(r'<a[^>]+href="[^"]*/statesparties/[^"]*"[^>]*>(.*?)</a>', html_min, re.I)
-    if states:
-        meta["states_parties"] = sorted({clean_text(s) for s in states if s.strip()})
 
-    #properties
-    props = re.findall(r'<a[^>]+href="[^"]*/list/[^"]*"[^>]*>(.*?)</a>', html_min, re.I)
-    if props:
-        meta["properties"] = sorted({clean_text(p) for p in props if p.strip()})
+#typ stranky podla URL alebo None ak ju ziaden extraktor nespracuje
+def page_type(url):
+    for spec in PAGE_SPECS:
+        if spec.url_re.match(url):
+            return spec.type
+    return None
 
-    #session
-    m = re.search(r'(?is)<div[^>]*>\s*Session\s*</div>\s*<a[^>]*>(.*?)</a>', html_min)
-    if m:
-        meta["session_name"] = clean_text(m.group(1))
+#vyberie extraktor podla typu URL
+#ak su zadane timings, extraktor do nich pripocita cas svojich krokov
+def process_html(html_src, url, timings=None):
+    if is_not_found(html_src):
+        return None, "404"
 
-    #soc reports
-    socs = re.findall(r'<a[^>]+href="[^"]*/soc/(\d+)/"[^>]*>(.*?)</a>', html_min, re.I)
-    if socs:
-        meta["soc_reports"] = [
-            {"soc_id": int(i), "title": clean_text(t)} for i, t in socs
-        ]
+    for spec in PAGE_SPECS:
+        if spec.url_re.match(url):
+            doc = spec.extract(html_src, url, timings)
+            break
+    else:
+        return None, None
 
-    #text
-    parts = re.findall(r"(?is)<(h[1-5]|p|li)[^>]*>(.*?)</\1>", html_min)
-    seen = set()
-    text_list = []
-    for tag, inner in parts:
-        s = clean_text(inner)
-        if not s:
-            continue
-        low = s.lower().strip(" :·")
-        if low in SECTION_LABELS or low.endswith(":"):
-            continue
-        if tag.startswith("h") and len(s.split()) <= 2:
-            continue
-        if s not in seen:
-            seen.add(s)
-            text_list.append(s)
-    text = html.unescape(" ".join(text_list))
-
-    doc = {
-        "url": url,
-        "type": "decision",
-        "decision_id": decision_id,
-        "title": title,
-        "decision_code": code or None,
-        "session_code": session_code or None,
-        "year": year,
-        "related_property_id": prop_id,
-        "text": text,
-        **meta
-    }
-    return {k: v for k, v in doc.items() if v is not None}
+    if not doc.get("text"):
+        return None, None
 
+    return doc, None
 
-def extract_soc_page(html_content, url):
-    html_min = re.sub(r"(?is)<(script|style|header|footer|nav)[^>]*>.*?</\1>", " ", html_content)
-    html_min = re.sub(r"(?is)<!--.*?-->", " ", html_min)
-
-    #odstrani sa vsetko pod nadpisom "Decisions adopted by the Committee" lebo obsahuje irelevantne info o inych pamiatkach
-    #inak by to davalo irelevantne vysledky pri vyhladavani
-    #napriklad ked som hladal bardejov tak to naslo boliviu lebo sa tam na spodku spominal :DDD
-    decisions_hdr_re = re.compile(
-        r'(?is)<h[1-6][^>]*>\s*Decisions\s+adopted\s+by\s+the\s+Committee(?:\s+in\s+\d{4})?\s*</h[1-6]>'
-    )
-    m_dec = decisions_hdr_re.search(html_min)
-    if m_dec:
-        html_min = html_min[:m_dec.start()]
-
-    m = SOC_URL_RE.match(url)
-    soc_id = int(m.group(1)) if m else None
-
-    t = re.search(r"(?is)<title[^>]*>(.*?)</title>", html_min)
-    title = html.unescape(t.group(1).strip()) if t else ""
-
-    #year
-    year = None
-    my = re.search(r"\bSOC\s*(19|20)\d{2}\b", title, re.I)
-    if my:
-        year = int(re.search(r"(19|20)\d{2}", my.group(0)).group(0))
-    else:
-        my2 = re.search(r"\b(19|20)\d{2}\b", title) or re.search(r"\b(19|20)\d{2}\b", html_min)
-        if my2:
-            year = int(re.search(r"(19|20)\d{2}", my2.group(0)).group(0))
-
-    #related property id
-    prop_id = None
-    mp = re.search(r"/en/list/(\d+)/?", html_min)
-    if mp:
-        prop_id = int(mp.group(1))
-
-    #site name
-    h1 = re.search(r"(?is)<h1[^>]*>(.*?)</h1>", html_min)
-    site_name = clean_text(h1.group(1)) if h1 else None
-
-    #summary
-    ps = re.findall(r"(?is)<p[^>]*>(.*?)</p>", html_min)
-    summary = None
-    for p in ps:
-        s = clean_text(p)
-        if s and len(s.split()) > 8:
-            summary = s
-            break
 
-    #text
-    parts = re.findall(r"(?is)<(h[1-5]|p|li)[^>]*>(.*?)</\1>", html_min)
-    seen = set()
-    text_list = []
-    for tag, inner in parts:
-        s = clean_text(inner)
-        if not s:
-            continue
-        low = s.lower().strip(" :·")
-        if low in SECTION_LABELS or low.endswith(":"):
-            continue
-        if tag.startswith("h") and (len(s.split()) <= 2):
-            continue
-        if s not in seen:
-            seen.add(s)
-            text_list.append(s)
-    text = html.unescape(" ".join(text_list))
-
-    doc = {
-        "url": url,
-        "type": "soc",
-        "soc_id": soc_id,
-        "title": title,
-        "year": year,
-        "related_property_id": prop_id,
-        "site_name": site_name or None,
-        "summary": summary or None,
-        "text": text
-    }
-    return {k: v for k, v in doc.items() if v is not None}
+def read_file(src_path):
+    with open(src_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
 
+def read_record(store_dir, segment, offset, length):
+    global segment_reader
+    if segment_reader is None:
+        segment_reader = SegmentReader(store_dir)
+    return segment_reader.read(segment, offset, length)
 
 def process_file(args):
     src_path, fname = args
     try:
-        with open(src_path, "r", encoding="utf-8", errors="ignore") as f:
-            html_src = f.read()
+        return process_html(read_file(src_path), filename_to_url(fname))
 
-        if is_not_found(html_src):
-            return None, "404"
+    except Exception as e:
+        return None, f"Error: {src_path}: {e}"
 
-        url = filename_to_url(fname)
 
-        if MAIN_LIST_URL_RE.match(url):
-            doc = extract_list_page(html_src, url)
-        elif DECISION_URL_RE.match(url):
-            doc = extract_decision_page(html_src, url)
-        elif SOC_URL_RE.match(url):
-            doc = extract_soc_page(html_src, url)
-        else:
-            return None, None
+#spracuje jeden zaznam z page store, URL je ulozena presne a netreba ju skladat z nazvu suboru
+def process_record(args):
+    store_dir, url, segment, offset, length = args
+    try:
+        return process_html(read_record(store_dir, segment, offset, length), url)
 
-        if not doc.get("text"):
-            return None, None
+    except Exception as e:
+        return None, f"Error: {url}: {e}"
 
-        return doc, None
 
+#pri --profile worker vrati (doc, msg, zaznam) a zaznam ma celkovy cas stranky aj casy jej krokov
+def profile_page(source, url, read):
+    timings = Counter()
+    html_src = ""
+    started = time.perf_counter()
+    try:
+        html_src = read()
+        timings["(read)"] = time.perf_counter() - started
+        doc, msg = process_html(html_src, url, timings=timings)
     except Exception as e:
-        return None, f"Error: {src_path}: {e}"
+        doc, msg = None, f"Error: {source}: {e}"
+    seconds = time.perf_counter() - started
+    doc_type = "404" if msg == "404" else page_type(url) or "other"
+    record = {"url": url, "type": doc_type, "size": len(html_src), "seconds": seconds, "fields": dict(timings)}
+    return doc, msg, record
 
+def profile_file(args):
+    src_path, fname = args
+    return profile_page(src_path, filename_to_url(fname), lambda: read_file(src_path))
+
+def profile_record(args):
+    store_dir, url, segment, offset, length = args
+    return profile_page(url, url, lambda: read_record(store_dir, segment, offset, length))
+
+#worker vysledok bez zaznamu posle len pri timeoute alebo pade, vtedy sa stranka zapise ako neuspesna
+def profile_result(profile, task, result, store):
+    if profile is None:
+        return
+    if len(result) > 2:
+        profile.add(result[2])
+        return
+    url = task[1] if store else filename_to_url(task[1])
+    profile.add_failed(url, page_type(url) or "other", result[1])
+
+def print_profile(profile):
+    print()
+    for line in profile.lines():
+        print(line)
+    profile.write(PROFILE_FILE)
+    print(f"Profile -> {PROFILE_FILE}")
+
+
+#proces workera: dostava davky (index, uloha) cez pipe a kazdy vysledok hned posle spat
+def worker_main(conn, func):
+    while True:
+        chunk = conn.recv()
+        if chunk is None:
+            break
+        for index, task in chunk:
+            conn.send((index, func(task)))
+    conn.close()
+
+
+#vlastny pool workerov s timeoutom na kazdu ulohu
+#kazdy worker ma vlastnu pipe, takze pri timeoute sa da zabit len on a nahradit novym
+#bez toho, aby sa poskodila spolocna fronta, ostatne ulohy z jeho davky sa vratia do fronty
+#naraz je rozdanych len workers * chunk_size uloh, imap_unordered vracia vysledky v poradi dokoncenia
+#a imap v poradi uloh
+class WorkerPool:
+    def __init__(self, func, workers=DEFAULT_WORKERS, timeout=TIMEOUT_SEC, chunk_size=CHUNK_SIZE):
+        self.func = func
+        self.size = max(1, workers)
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.workers = {}
+        self.restarted = 0
+
+    def _spawn(self):
+        conn, child = Pipe()
+        proc = Process(target=worker_main, args=(child, self.func), daemon=True)
+        proc.start()
+        child.close()
+        self.workers[conn] = {"proc": proc, "assigned": deque(), "deadline": None, "done": 0}
+
+    #zabije workera, vrati index ulohy na ktorej sa zasekol a zvysok davky vrati do fronty
+    def _kill(self, conn, pending):
+        worker = self.workers.pop(conn)
+        worker["proc"].terminate()
+        worker["proc"].join()
+        conn.close()
+        self.restarted += 1
+        self._spawn()
+        if not worker["assigned"]:
+            return None
+        stuck = worker["assigned"].popleft()
+        pending.extendleft(reversed(worker["assigned"]))
+        return stuck
+
+    #po MAX_TASKS_PER_WORKER sa necinny worker ukonci a nahradi
+    def _recycle(self, conn):
+        worker = self.workers.pop(conn)
+        conn.send(None)
+        conn.close()
+        worker["proc"].join()
+        self._spawn()
+
+    #generator dvojic (uloha, vysledok) v poradi dokoncenia
+    def imap_unordered(self, tasks):
+        for index, result in self._results(tasks):
+            yield tasks[index], result
+
+    #generator dvojic (uloha, vysledok) v poradi uloh, hotove vysledky cakaju kym dobehnu vsetky predchadzajuce
+    #poradie vystupu (a tym doc_id v pages.jsonl) tak nezavisi od toho, ktory worker skoncil skor
+    def imap(self, tasks):
+        done = {}
+        next_index = 0
+        for index, result in self._results(tasks):
+            done[index] = result
+            while next_index in done:
+                yield tasks[next_index], done.pop(next_index)
+                next_index += 1
+
+    #dvojice (index ulohy, vysledok) v poradi dokoncenia
+    def _results(self, tasks):
+        pending = deque(range(len(tasks)))
+        for _ in range(self.size):
+            self._spawn()
+        try:
+            while pending or any(w["assigned"] for w in self.workers.values()):
+                for conn, worker in list(self.workers.items()):
+                    if worker["assigned"] or not pending:
+                        continue
+                    if worker["done"] >= MAX_TASKS_PER_WORKER:
+                        self._recycle(conn)
+                        continue
+                    chunk = [pending.popleft() for _ in range(min(self.chunk_size, len(pending)))]
+                    conn.send([(index, tasks[index]) for index in chunk])
+                    worker["assigned"].extend(chunk)
+                    worker["deadline"] = time.monotonic() + self.timeout
+
+                for conn in wait(list(self.workers), timeout=0.5):
+                    worker = self.workers[conn]
+                    try:
+                        index, result = conn.recv()
+                    except (EOFError, OSError):
+                        #worker spadol (napr. nedostatok pamate)
+                        index = self._kill(conn, pending)
+                        if index is not None:
+                            yield index, (None, f"Worker died: exit code {worker['proc'].exitcode}")
+                        continue
+                    worker["assigned"].popleft()
+                    worker["done"] += 1
+                    worker["deadline"] = time.monotonic() + self.timeout
+                    yield index, result
+
+                now = time.monotonic()
+                for conn, worker in list(self.workers.items()):
+                    if worker["assigned"] and now > worker["deadline"]:
+                        #vysledok mohol prist medzi wait a kontrolou, ten sa spracuje v dalsom kole
+                        if conn.poll():
+                            continue
+                        index = self._kill(conn, pending)
+                        yield index, (None, f"Timeout: over {self.timeout}s")
+        finally:
+            self.close()
+
+    def close(self):
+        for conn, worker in self.workers.items():
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for conn, worker in self.workers.items():
+            worker["proc"].join(timeout=1)
+            if worker["proc"].is_alive():
+                worker["proc"].terminate()
+            conn.close()
+        self.workers = {}
+
+
+#nacita URL novych a zmenenych stranok zo suboru changes.jsonl od crawlera
+def load_changed_urls(path):
+    urls = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                urls.add(json.loads(line)["url"])
+    return urls
+
+#kluc stranky pre --changes: pri page store presna URL, pri suboroch nazov suboru stranky
+#URL dokumentov zo suborov je poskladana z nazvu suboru (filename_to_url) a s URL crawlera sa nemusi zhodovat,
+#nazov suboru z nej aj z URL crawlera (page_file_name) je ale rovnaky
+def change_key(url, store):
+    return url if store else page_file_name(url)
+
+#kluc ulohy: URL zaznamu v page store alebo nazov suboru bez pripony
+def task_key(task, store):
+    return task[1] if store else os.path.splitext(task[1])[0]
+
+#v OUT_FILE nahradi dokumenty zmenenych stranok novymi, ostatne riadky ostanu v povodnom poradi
+#changed a gone su kluce stranok (change_key), dokument sa zmaze len ak sa jeho stranka naozaj spracovala
+#a nevznikol z nej dokument (gone: 404 alebo prazdny text), pri chybe, timeoute alebo chybajucom zdroji ostane
+def merge_changes(changed, gone, delta_file, store):
+    updated = {}
+    with open(delta_file, "r", encoding="utf-8") as f:
+        for line in f:
+            doc = json.loads(line)
+            updated[change_key(doc["url"], store)] = doc
+
+    replaced = removed = kept = 0
+    tmp_file = OUT_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as out:
+        if os.path.exists(OUT_FILE):
+            with open(OUT_FILE, "r", encoding="utf-8") as src:
+                for line in src:
+                    key = change_key(json.loads(line).get("url") or "", store)
+                    if key in changed:
+                        doc = updated.pop(key, None)
+                        if doc is not None:
+                            line = json.dumps(doc, ensure_ascii=False) + "\n"
+                            replaced += 1
+                        elif key in gone:
+                            #stranka sa zmenila tak, ze z nej uz nevznikne dokument
+                            removed += 1
+                            continue
+                        else:
+                            kept += 1
+                    out.write(line)
+        for doc in updated.values():
+            out.write(json.dumps(doc, ensure_ascii=False) + "\n")
+    os.replace(tmp_file, OUT_FILE)
+    os.remove(delta_file)
+    return replaced, len(updated), removed, kept
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+#rozdeli stranky na nezmenene a tie, ktore treba spracovat
+#subor sa povazuje za nezmeneny ak ma rovnaku velkost a mtime, inak sa porovna hash obsahu
+#pri page store je hash obsahu priamo v indexe, vrati (ulohy, {zdroj: (url, size, mtime, hash)}, pocet nezmenenych)
+def plan_incremental(files, manifest, store_hashes=None):
+    todo = []
+    meta = {}
+    unchanged = 0
+    for task in files:
+        if store_hashes is not None:
+            source = url = task[1]
+            size, mtime, digest = task[4], 0, store_hashes[url]
+        else:
+            source, fname = task
+            url = filename_to_url(fname)
+            st = os.stat(source)
+            size, mtime, digest = st.st_size, st.st_mtime_ns, None
+
+        entry = manifest.get(source)
+        if entry is not None and entry[3] == EXTRACTOR_VERSION:
+            if digest is None and entry[:2] == (size, mtime):
+                unchanged += 1
+                continue
+            if digest is None:
+                digest = file_hash(source)
+                if digest == entry[2]:
+                    manifest.touch(source, size, mtime)
+            if digest == entry[2]:
+                unchanged += 1
+                continue
+        if digest is None:
+            digest = file_hash(source)
+        meta[source] = (url, size, mtime, digest)
+        todo.append(task)
+    return todo, meta, unchanged
+
+def delta_op(old, doc):
+    if doc and not old:
+        return "added"
+    if old and not doc:
+        return "removed"
+    if doc != old:
+        return "changed"
+    return None
+
+#spracuje len nove a zmenene stranky, vysledky si pamata v manifeste
+#pages.jsonl sa prepise z manifestu len ak sa nieco zmenilo a do DELTA_FILE idu zmenene dokumenty
+def run_incremental(args, files, worker, store_hashes=None, profile=None):
+    manifest = ExtractManifest(args.manifest)
+    current = {f[1] if store_hashes is not None else f[0] for f in files}
+    todo, meta, unchanged = plan_incremental(files, manifest, store_hashes)
+    print(f"Unchanged {unchanged}/{len(files)} pages, processing {len(todo)}")
+
+    ops = Counter()
+    total = errs = 0
+    pool = WorkerPool(worker, args.workers, args.timeout, args.chunk_size)
+    with open(DELTA_FILE, "w", encoding="utf-8") as delta:
+        for task, result in pool.imap(todo):
+            doc, msg = result[:2]
+            profile_result(profile, task, result, store_hashes is not None)
+            total += 1
+            if msg and msg != "404" and not doc:
+                #chybna stranka sa do manifestu nezapise, skusi sa znova pri dalsom behu
+                errs += 1
+                print(f"\n[WARN] {msg}")
+                continue
+            source = task[1] if store_hashes is not None else task[0]
+            url, size, mtime, digest = meta[source]
+            old = manifest.doc(source) if source in manifest else None
+            manifest.put(source, url, size, mtime, digest, EXTRACTOR_VERSION, doc)
+            op = delta_op(old, doc)
+            if op:
+                ops[op] += 1
+                record = {"op": op, "url": url}
+                if doc:
+                    record["doc"] = doc
+                delta.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if total % WRITE_BATCH == 0 or total == len(todo):
+                print(f"\rProcessed {total}/{len(todo)} | errors: {errs}", end="", flush=True)
+
+        #stranky, ktore medzicasom zmizli
+        for source in manifest.sources():
+            if source in current:
+                continue
+            old = manifest.doc(source)
+            manifest.remove(source)
+            if old:
+                ops["removed"] += 1
+                delta.write(json.dumps({"op": "removed", "url": old["url"]}, ensure_ascii=False) + "\n")
+
+    if ops or not os.path.exists(OUT_FILE):
+        tmp_file = OUT_FILE + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as out:
+            batch = []
+            #v poradi uloh, rovnako ako pri plnej extrakcii
+            for line in manifest.doc_lines(f[1] if store_hashes is not None else f[0] for f in files):
+                batch.append(line)
+                if len(batch) >= WRITE_BATCH:
+                    out.write("".join(batch))
+                    batch = []
+            out.write("".join(batch))
+        os.replace(tmp_file, OUT_FILE)
+    manifest.close()
+
+    print(f"\nDelta: added {ops['added']} | changed {ops['changed']} | removed {ops['removed']} -> {DELTA_FILE}")
+    if pool.restarted:
+        print(f"Restarted {pool.restarted} stuck workers")
+
+
+#predfilter z prefilter.py: 404 podla zaciatku stranky, presne a takmer rovnake stranky
+#odtlacky sa pocitaju paralelne, o duplikatoch sa rozhoduje v poradi uloh, aby sa vzdy nechala ta ista stranka
+#vrati ulohy pre extrakciu a pocty vyhodenych stranok
+def run_prefilter(args, files):
+    import prefilter
+    func = prefilter.prefilter_record if args.store else prefilter.prefilter_file
+    pool = WorkerPool(func, args.workers, args.timeout, args.chunk_size)
+    prints = {}
+    skipped = Counter()
+    done = 0
+    for task, (value, msg) in pool.imap_unordered(files):
+        done += 1
+        if msg == "404":
+            skipped["404"] += 1
+            prints[task[:2]] = False
+        else:
+            #chybne stranky idu do extrakcie, ktora chybu nahlasi
+            prints[task[:2]] = value
+        if done % WRITE_BATCH == 0 or done == len(files):
+            print(f"\rPre-filter {done}/{len(files)} | 404: {skipped['404']}", end="", flush=True)
+
+    dups = prefilter.DuplicateFilter()
+    kept = []
+    with open(DUPLICATES_FILE, "w", encoding="utf-8") as log:
+        for task in sorted(files):
+            value = prints.get(task[:2])
+            if value is False:
+                continue
+            if value is None:
+                kept.append(task)
+                continue
+            url = task[1] if args.store else filename_to_url(task[1])
+            doc_type, digest, sketch = value
+            found = dups.check(url, doc_type, digest, sketch)
+            if found is None:
+                kept.append(task)
+                continue
+            kind, original = found
+            log.write(json.dumps({"url": url, "duplicate_of": original, "kind": kind}, ensure_ascii=False) + "\n")
+    skipped.update(dups.skipped)
+    print(f"\nPre-filter: 404 {skipped['404']} | exact duplicates {skipped['exact']} | "
+          f"near duplicates {skipped['near']} -> extracting {len(kept)}/{len(files)}")
+    return kept, skipped
+
+
+#stlpcova kopia hotoveho pages.jsonl, pyarrow sa importuje len ked sa Parquet naozaj zapisuje
+def export_parquet(out_dir):
+    import columnar
+    if columnar.is_fresh(out_dir, OUT_FILE):
+        return
+    counts = columnar.write_parquet(OUT_FILE, out_dir)
+    print("Parquet: " + " | ".join(f"{doc_type} {n}" for doc_type, n in sorted(counts.items())) + f" -> {out_dir}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extrakcia dokumentov zo stiahnutych stranok")
+    parser.add_argument("--store", help="citat stranky z page store namiesto adresara pages_filtered")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--changes", help="spracovat len stranky z changes.jsonl a aktualizovat existujuci pages.jsonl")
+    mode.add_argument("--incremental", action="store_true",
+                      help="spracovat len stranky zmenene od minuleho behu podla manifestu")
+    mode.add_argument("--prefilter", action="store_true",
+                      help="pred extrakciou vyhodit 404 a presne aj takmer rovnake stranky")
+    parser.add_argument("--manifest", default=MANIFEST_DB, help="manifest pre --incremental")
+    parser.add_argument("--parquet", nargs="?", const="pages_parquet", metavar="DIR",
+                        help="zapisat aj Parquet rozdeleny podla typu (vyzaduje pyarrow)")
+    parser.add_argument("--profile", nargs="?", const=SLOWEST_PAGES, type=int, metavar="N",
+                        help=f"zmerat cas stranok, typov a poli a vypisat N najpomalsich stranok (aj do {PROFILE_FILE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="pocet worker procesov")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_SEC, help="limit v sekundach na jednu stranku")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="kolko stranok dostane worker naraz")
+    return parser.parse_args()
 
 def main():
-    files = []
-    for root, _, names in os.walk(SRC_DIR):
-        for fname in names:
-            files.append((os.path.join(root, fname), fname))
+    args = parse_args()
+    if args.store:
+        #zaznamy su zoradene podla segmentu a offsetu, takze sa segmenty citaju sekvencne
+        store = PageStore(args.store)
+        records = store.records()
+        store.close()
+        files = [(args.store, url, seg, off, length) for url, seg, off, length, _ in records]
+        store_hashes = {url: digest for url, _, _, _, digest in records}
+        worker = profile_record if args.profile else process_record
+    else:
+        store_hashes = None
+        files = []
+        for root, _, names in os.walk(SRC_DIR):
+            for fname in names:
+                files.append((os.path.join(root, fname), fname))
+        worker = profile_file if args.profile else process_file
+    profile = ExtractProfile(args.profile) if args.profile else None
+
+    if args.incremental:
+        run_incremental(args, files, worker, store_hashes, profile)
+        if profile:
+            print_profile(profile)
+        if args.parquet:
+            export_parquet(args.parquet)
+        print("Done.")
+        return
+
+    out_file = OUT_FILE
+    if args.changes:
+        #zmenene stranky sa hladaju podla URL z changes.jsonl, pri suboroch cez nazov suboru, ktory z nej crawler vytvoril
+        changed = {change_key(url, args.store): url for url in load_changed_urls(args.changes)}
+        files = [f for f in files if task_key(f, args.store) in changed]
+        missing = set(changed) - {task_key(f, args.store) for f in files}
+        if missing:
+            print(f"[WARN] {len(missing)} changed pages not found in {args.store or SRC_DIR}, keeping their documents:")
+            for key in sorted(missing)[:10]:
+                print(f"  {changed[key]}")
+        out_file = OUT_FILE + ".delta"
+    #URL spracovanych stranok, z ktorych nevznikol dokument
+    gone = set()
+
+    prefiltered = Counter()
+    if args.prefilter:
+        files, prefiltered = run_prefilter(args, files)
 
     total = written = skipped = errs = 0
-    procs = min(4, cpu_count())
-
-    with open(OUT_FILE, "w", encoding="utf-8") as out, Pool(processes=procs, maxtasksperchild=200) as pool:
-        jobs = [pool.apply_async(process_file, args=(f,)) for f in files]
-
-        for job in jobs:
-            try:
-                doc, msg = job.get(timeout=TIMEOUT_SEC)
-            except Exception as e:
-                doc, msg = None, f"Timeout/Error: {e!r}"
-
+    pool = WorkerPool(worker, args.workers, args.timeout, args.chunk_size)
+
+    #vysledky sa zapisuju po davkach v poradi uloh, doc_id (cislo riadku) su tak pri kazdom behu rovnake
+    with open(out_file, "w", encoding="utf-8") as out:
+        batch = []
+        for task, result in pool.imap(files):
+            doc, msg = result[:2]
+            profile_result(profile, task, result, args.store)
             total += 1
-            if msg == "404":
-                skipped += 1
-            elif msg and not doc:
+            if msg and msg != "404" and not doc:
                 errs += 1
                 print(f"\n[WARN] {msg}")
             elif doc:
-                out.write(json.dumps(doc, ensure_ascii=False) + "\n")
-                out.flush()
+                batch.append(json.dumps(doc, ensure_ascii=False) + "\n")
                 written += 1
-
-            print(f"\rProcessed {total}/{len(files)} | written: {written} | 404: {skipped} | errors: {errs}", end="", flush=True)
+            else:
+                if msg == "404":
+                    skipped += 1
+                if args.changes:
+                    gone.add(task_key(task, args.store))
+
+            if len(batch) >= WRITE_BATCH or total == len(files):
+                out.write("".join(batch))
+                batch = []
+                print(f"\rProcessed {total}/{len(files)} | written: {written} | 404: {skipped} | errors: {errs}", end="", flush=True)
+        out.write("".join(batch))
+
+    if pool.restarted:
+        print(f"\nRestarted {pool.restarted} stuck workers")
+
+    if profile:
+        print_profile(profile)
+
+    if args.prefilter:
+        print(f"\nSkipped before extraction: 404 {prefiltered['404']} | exact duplicates {prefiltered['exact']} | "
+              f"near duplicates {prefiltered['near']} -> {DUPLICATES_FILE}")
+
+    if args.changes:
+        replaced, added, removed, kept = merge_changes(changed, gone, out_file, args.store)
+        print(f"\nUpdated {OUT_FILE}: replaced {replaced} | added {added} | removed {removed}")
+        if kept:
+            print(f"[WARN] kept {kept} old documents of changed pages that failed or were not found")
+
+    if args.parquet:
+        print()
+        export_parquet(args.parquet)
 
     print("\nDone.")
 
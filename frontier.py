@@ -0,0 +1,257 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import sys
+import time
+import html
+import bisect
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import deque
+
+FRONTIER_DB = "frontier.db"
+
+DISCOVERED = "discovered"
+VISITED = "visited"
+FAILED = "failed"
+
+#predvolena priorita, nizsie cislo sa stahuje skor
+DEFAULT_PRIORITY = 2
+
+#po kolkych novych odtlackoch sa pending mnozina zlucuje do zoradeneho pola
+FINGERPRINT_MERGE = 65536
+
+#64-bitovy odtlacok URL
+def fingerprint(url):
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+#mnozina 64-bitovych odtlackov v zoradenom poli, 8 bajtov na URL namiesto celeho stringu
+#nove odtlacky idu najprv do malej mnoziny a po davkach sa zlucia do pola
+class FingerprintSet:
+    def __init__(self):
+        self.sorted = array("Q")
+        self.pending = set()
+
+    def __len__(self):
+        return len(self.sorted) + len(self.pending)
+
+    def __contains__(self, fp):
+        if fp in self.pending:
+            return True
+        i = bisect.bisect_left(self.sorted, fp)
+        return i < len(self.sorted) and self.sorted[i] == fp
+
+    def add(self, fp):
+        self.pending.add(fp)
+        if len(self.pending) >= FINGERPRINT_MERGE:
+            self.merge()
+
+    #hromadne pridanie pri nacitani frontier
+    def update(self, fps):
+        self.sorted.extend(fps)
+        self.merge()
+
+    #timsort spoji dva zoradene useky linearne, duplicity pri kolizii bisect nevadia
+    def merge(self):
+        merged = self.sorted + array("Q", sorted(self.pending))
+        self.sorted = array("Q", sorted(merged))
+        self.pending = set()
+
+    def nbytes(self):
+        return sys.getsizeof(self.sorted) + sys.getsizeof(self.pending) + len(self.pending) * sys.getsizeof(2 ** 63)
+
+#frontier crawlera ulozeny v sqlite, kazda normalizovana URL ma svoj stav
+#fronta je v pamati ako deque pre kazdu prioritu (O(1) pop), databaza sluzi na presny resume po pade
+#pristup je chraneny zamkom, aby ho mohlo zdielat viac selenium workerov
+#s compact=True sa mnozina videnych URL drzi len ako 64-bitove odtlacky,
+#pri zhode odtlacku sa URL presne overi v databaze
+class Frontier:
+    def __init__(self, path=FRONTIER_DB, compact=False):
+        self.compact = compact
+        self.fresh = not os.path.exists(path)
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        #WAL zapisuje rychlo a po pade ostane databaza konzistentna
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            "url TEXT PRIMARY KEY, status TEXT NOT NULL, error TEXT, updated REAL, "
+            f"priority INTEGER NOT NULL DEFAULT {DEFAULT_PRIORITY})"
+        )
+        #databazy zo starsej verzie nemaju stlpec priority
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(urls)")}
+        if "priority" not in columns:
+            self.db.execute(f"ALTER TABLE urls ADD COLUMN priority INTEGER NOT NULL DEFAULT {DEFAULT_PRIORITY}")
+        #validatory pre podmienene stahovanie pri opakovanom crawle
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS validators ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash TEXT, checked REAL)"
+        )
+        self.db.commit()
+
+        self.queues = {}
+        self.queued = 0
+        self.seen = FingerprintSet() if compact else set()
+        self.known = 0
+        self.visited = 0
+        self.failed = 0
+
+        #stranky ktore boli rozpracovane pri pade ostali v stave discovered, takze sa stiahnu znova
+        loaded = array("Q")
+        for url, status, priority in self.db.execute("SELECT url, status, priority FROM urls ORDER BY rowid"):
+            self.known += 1
+            if compact:
+                loaded.append(fingerprint(url))
+            else:
+                self.seen.add(url)
+            if status == DISCOVERED:
+                self._push(url, priority)
+            elif status == VISITED:
+                self.visited += 1
+            else:
+                self.failed += 1
+        if compact:
+            self.seen.update(loaded)
+
+    def __len__(self):
+        return self.queued
+
+    def _push(self, url, priority):
+        queue = self.queues.get(priority)
+        if queue is None:
+            queue = self.queues[priority] = deque()
+        queue.append(url)
+        self.queued += 1
+
+    def __contains__(self, url):
+        with self.lock:
+            return self._known(url)[0]
+
+    #vrati (je_znama, kluc do seen)
+    def _known(self, url):
+        if not self.compact:
+            return url in self.seen, url
+        fp = fingerprint(url)
+        if fp not in self.seen:
+            return False, fp
+        #presna kontrola, odtlacky sa mozu (velmi zriedka) zhodovat
+        row = self.db.execute("SELECT 1 FROM urls WHERE url = ?", (url,)).fetchone()
+        return row is not None, fp
+
+    #prida URL do fronty s danou prioritou, vrati True ak je nova
+    def add(self, url, priority=DEFAULT_PRIORITY):
+        with self.lock:
+            known, key = self._known(url)
+            if known:
+                return False
+            self.seen.add(key)
+            self.known += 1
+            self._push(url, priority)
+            self.db.execute(
+                "INSERT OR IGNORE INTO urls (url, status, updated, priority) VALUES (?, ?, ?, ?)",
+                (url, DISCOVERED, time.time(), priority)
+            )
+            return True
+
+    #vrati dalsiu URL s najvyssou prioritou alebo None ak je fronta prazdna
+    #urovni priority je par, takze prechod cez ne je prakticky O(1)
+    def pop(self):
+        with self.lock:
+            for priority in sorted(self.queues):
+                queue = self.queues[priority]
+                if queue:
+                    self.queued -= 1
+                    return queue.popleft()
+            return None
+
+    def mark_visited(self, url):
+        with self.lock:
+            self._set_status(url, VISITED, None)
+            self.visited += 1
+
+    def mark_failed(self, url, error=None):
+        with self.lock:
+            self._set_status(url, FAILED, error)
+            self.failed += 1
+
+    #commit raz za stranku, spolu s linkami ktore na nej boli objavene
+    def _set_status(self, url, status, error):
+        self.db.execute(
+            "UPDATE urls SET status = ?, error = ?, updated = ? WHERE url = ?",
+            (status, error, time.time(), url)
+        )
+        self.db.commit()
+
+    #vrati ulozene validatory stranky (etag, last_modified, body_hash) alebo None
+    def validators(self, url):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified, body_hash FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "body_hash": row[2]}
+
+    #commit sa spravi spolu so stavom stranky v mark_visited
+    def set_validators(self, url, etag, last_modified, body_hash):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO validators (url, etag, last_modified, body_hash, checked) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body_hash, time.time())
+            )
+
+    #pri opakovanom crawle sa vsetky navstivene stranky vratia do fronty
+    def requeue_visited(self):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT url, priority FROM urls WHERE status = ? ORDER BY rowid", (VISITED,)
+            ).fetchall()
+            self.db.execute("UPDATE urls SET status = ? WHERE status = ?", (DISCOVERED, VISITED))
+            self.db.commit()
+            for url, priority in rows:
+                self._push(url, priority)
+            self.visited = 0
+            return len(rows)
+
+    #jednorazovy import stareho stavu z links.txt, is_visited rozhodne ci stranka uz bola stiahnuta
+    #a priority_of vrati prioritu URL alebo None ak sa ma preskocit
+    def import_legacy(self, links_file, is_visited, priority_of=lambda url: DEFAULT_PRIORITY):
+        if not os.path.exists(links_file):
+            return 0
+        imported = 0
+        with open(links_file, "r", encoding="utf-8") as f:
+            for line in f:
+                link = html.unescape(line.strip())
+                if not link:
+                    continue
+                visited = is_visited(link)
+                priority = priority_of(link)
+                if priority is None:
+                    if not visited:
+                        continue
+                    priority = DEFAULT_PRIORITY
+                if not self.add(link, priority):
+                    continue
+                imported += 1
+                if visited:
+                    self.queues[priority].pop()
+                    self.queued -= 1
+                    self.mark_visited(link)
+        self.db.commit()
+        return imported
+
+    #odhad pamate mnoziny videnych URL v bajtoch
+    def seen_bytes(self):
+        with self.lock:
+            if self.compact:
+                return self.seen.nbytes()
+            return sys.getsizeof(self.seen) + sum(sys.getsizeof(url) for url in self.seen)
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
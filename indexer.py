@@ -1,28 +1,38 @@
 #
 # Dominik Mifkovič 2025
 #
+import os
 import json
-import re
-import unicodedata
+import heapq
+import shutil
+import time
+import struct
+import argparse
+import multiprocessing
+import bm25
 from collections import defaultdict, Counter
+from analysis import tokenize_values
+from binary_index import IndexWriter, TERMS_FILE, POSTINGS_FILE, DOCS_FILE, encode_postings, decode_postings
 
 INPUT_FILE = "pages.jsonl"
 INDEX_FILE = "index.jsonl"
 DOC_STATS_FILE = "docs_meta.json"
-
-#regex pre tokenizaciu, berie aj cisla
-token_pattern = re.compile(r"[^\W_]+", re.UNICODE)
-
-def normalize_text(text: str) -> str:
-    if text is None:
-        return ""
-    text = unicodedata.normalize("NFKD", str(text))
-    text = "".join(c for c in text if not unicodedata.combining(c))
-    return text.lower().strip()
-
-def tokenize(text: str):
-    text = normalize_text(text)
-    return token_pattern.findall(text)
+#Parquet z extractor_par.py --parquet
+PAGES_PARQUET = "pages_parquet"
+#ciastocne indexy (runy) a metadata dokumentov pocas stavby indexu
+RUN_DIR = "index_runs"
+#pamatovy limit pre postings v MB, po jeho prekroceni sa zapise run
+MEMORY_MB = 512
+#odhad pamate jedneho postingu (tuple v liste) a noveho tokenu (str, list, polozka v dict) v bajtoch
+POSTING_BYTES = 100
+TERM_BYTES = 200
+#dlzka termu a dlzka postings v rune, tokenizer dlzku tokenu neobmedzuje
+RUN_RECORD = struct.Struct("<II")
+RUN_BUFFER = 1024 * 1024
+#najviac tolko runov sa zlucuje naraz, inak sa najprv zlucia do medzivysledkov (limit otvorenych suborov)
+MERGE_FANIN = 64
+#pri --workers sa pages.jsonl rozdeli na tolko casti na jeden proces, aby sa pomalsie casti vyrovnali
+SHARDS_PER_WORKER = 4
 
 #rekurzivne zozbiera vsetky hodnoty
 def gather_values(x):
@@ -42,63 +52,302 @@ def gather_values(x):
         return out
     return []
 
-#vytvori invertovany index
-def build_index():
-    index = defaultdict(list)   #token -> list[(doc_id, tf)]
-    global_tf = Counter()       #token -> total tf
-    doc_meta = {}               #doc_id -> {url, title, type}
-    doc_lengths = {}            #doc_id -> token count
-    total_docs = 0
-
+#dokumenty v poradi pages.jsonl, ak je k nemu aktualny Parquet, citaju sa z neho
+def read_docs():
+    if os.path.isdir(PAGES_PARQUET):
+        import columnar
+        if columnar.is_fresh(PAGES_PARQUET, INPUT_FILE):
+            for _, doc in columnar.iter_docs(PAGES_PARQUET):
+                yield doc
+            return
     with open(INPUT_FILE, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
-            doc = json.loads(line)
+            yield json.loads(line)
+
+#zapise zoradeny ciastocny index (run) na disk: pre kazdy term dlzka termu, dlzka postings, term a postings ako varinty
+#items su dvojice (token, postings) zoradene podla tokenu
+def write_run(path, items):
+    with open(path, "wb") as f:
+        for token, postings in items:
+            raw = token.encode("utf-8")
+            data = encode_postings(postings)
+            f.write(RUN_RECORD.pack(len(raw), len(data)))
+            f.write(raw)
+            f.write(data)
+
+#dvojice (token, postings) z runu v poradi termov
+#run z paralelnej casti ma lokalne doc_id, offset ich posunie na globalne
+def read_run(path, offset=0):
+    with open(path, "rb", buffering=RUN_BUFFER) as f:
+        while True:
+            header = f.read(RUN_RECORD.size)
+            if not header:
+                break
+            term_len, data_len = RUN_RECORD.unpack(header)
+            token = f.read(term_len).decode("utf-8")
+            postings = decode_postings(f.read(data_len))
+            if offset:
+                postings = [(doc_id + offset, tf) for doc_id, tf in postings]
+            yield token, postings
+
+#k-cestne zlucenie runov, vrati trojice (token, postings, global_tf) zoradene podla tokenu
+#runy su v poradi dokumentov, takze postings jedneho tokenu sa len spoja za sebou
+def merge_runs(runs):
+    streams = [((token, i, postings) for token, postings in run) for i, run in enumerate(runs)]
+    current, merged = None, []
+    for token, _, postings in heapq.merge(*streams):
+        if token != current:
+            if current is not None:
+                yield current, merged, sum(tf for _, tf in merged)
+            current, merged = token, []
+        merged.extend(postings)
+    if current is not None:
+        yield current, merged, sum(tf for _, tf in merged)
+
+#zlucuje runy po MERGE_FANIN do vacsich, kym ich nie je najviac MERGE_FANIN
+#runy su dvojice (cesta, offset doc_id), zlucene runy uz maju globalne doc_id
+def reduce_runs(runs):
+    level = 0
+    while len(runs) > MERGE_FANIN:
+        reduced = []
+        for start in range(0, len(runs), MERGE_FANIN):
+            group = runs[start:start + MERGE_FANIN]
+            if len(group) == 1:
+                reduced.extend(group)
+                continue
+            path = os.path.join(RUN_DIR, f"merge-{level}-{len(reduced):05d}.bin")
+            merged = merge_runs([read_run(run, offset) for run, offset in group])
+            write_run(path, ((token, postings) for token, postings, _ in merged))
+            for run, _ in group:
+                os.remove(run)
+            reduced.append((path, 0))
+        runs = reduced
+        level += 1
+    return runs
+
+#zostavajuci index v pamati ako posledny run, bez zapisu na disk
+def memory_run(index):
+    for token in sorted(index):
+        yield token, index[token]
+
+#metadata dokumentov zo spill suborov ako trojice (doc_id, dlzka, metadata), spills su dvojice (cesta, offset doc_id)
+def read_spills(spills):
+    for path, offset in spills:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                doc_id, length, meta = json.loads(line)
+                yield doc_id + offset, length, meta
+
+#priemerna dlzka dokumentu a BM25 normy podla doc_id, spill subory sa precitaju dvakrat
+#priemer je len cez dokumenty so zaznamom dlzky, dokumenty bez tokenov v spill suboroch nie su
+def doc_norms(total_docs, spills):
+    total_length = n_lengths = 0
+    for _, length, _ in read_spills(spills):
+        total_length += length
+        n_lengths += 1
+    avg_length = total_length / n_lengths if n_lengths else 0.0
+    lengths = ((doc_id, length) for doc_id, length, _ in read_spills(spills))
+    return avg_length, bm25.doc_norms(lengths, total_docs, avg_length)
+
+#docs_meta.json sa zapisuje po castiach v rovnakom tvare ako json.dump(..., indent=2)
+def write_doc_stats(total_docs, avg_length, spills):
+    def section(name, items, last):
+        meta_out.write(f'  "{name}": ')
+        first = True
+        for doc_id, value in items:
+            body = json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+            meta_out.write(("{\n" if first else ",\n") + f'    "{doc_id}": {body}')
+            first = False
+        meta_out.write("{}" if first else "\n  }")
+        meta_out.write("\n" if last else ",\n")
+
+    with open(DOC_STATS_FILE, "w", encoding="utf-8") as meta_out:
+        meta_out.write(f'{{\n  "total_docs": {total_docs},\n  "avg_doc_length": {json.dumps(avg_length)},\n')
+        section("doc_lengths", ((doc_id, length) for doc_id, length, _ in read_spills(spills)), False)
+        section("docs", ((doc_id, meta) for doc_id, _, meta in read_spills(spills)), True)
+        meta_out.write("}")
+
+#SPIMI nad dokumentmi: postings sa zbieraju v pamati, a ked odhad ich velkosti prekroci memory_mb,
+#zoradia sa a zapisu ako run do run_dir, metadata dokumentov idu priebezne do run_dir/docs.jsonl
+#doc_id su poradie dokumentu od 1, vrati (pocet dokumentov, runy na disku, zvysok indexu v pamati)
+def invert(docs, run_dir, memory_mb, progress=True):
+    budget = memory_mb * 1024 * 1024
+    index = defaultdict(list)   #token -> list[(doc_id, tf)]
+    used = 0                    #odhad pamate postings v index
+    runs = []
+    total_docs = 0
+
+    os.makedirs(run_dir, exist_ok=True)
+    with open(os.path.join(run_dir, "docs.jsonl"), "w", encoding="utf-8") as docs_out:
+        for doc in docs:
             total_docs += 1
             doc_id = total_docs
 
-            pieces = gather_values(doc)
-            combined = " ".join(pieces)
-            tokens = tokenize(combined)
+            tokens = tokenize_values(gather_values(doc))
             if not tokens:
                 continue
 
             counts = Counter(tokens)
             for token, tf in counts.items():
-                index[token].append((doc_id, tf))
-                global_tf[token] += tf
+                postings = index[token]
+                if not postings:
+                    used += TERM_BYTES + len(token)
+                postings.append((doc_id, tf))
+            used += POSTING_BYTES * len(counts)
 
-            doc_meta[doc_id] = {
+            meta = {
                 "url": doc.get("url", ""),
                 "title": doc.get("title", ""),
                 "type": doc.get("type", "")
             }
-            doc_lengths[doc_id] = sum(counts.values())
+            docs_out.write(json.dumps([doc_id, sum(counts.values()), meta], ensure_ascii=False) + "\n")
 
-            if total_docs % 200 == 0:
+            if used >= budget:
+                path = os.path.join(run_dir, f"run-{len(runs):05d}.bin")
+                write_run(path, memory_run(index))
+                runs.append(path)
+                index = defaultdict(list)
+                used = 0
+
+            if progress and total_docs % 200 == 0:
                 print(f"\rIndexed {total_docs} docs...", end="", flush=True)
+    return total_docs, runs, index
 
-    print(f"\nTotal indexed: {total_docs}")
-    print(f"Unique tokens: {len(index)}")
+#dokumenty z riadkov pages.jsonl, ktore zacinaju v rozsahu bajtov [start, end)
+#riadok cez hranicu patri do casti, v ktorej zacina, takze kazdy riadok spracuje prave jedna cast
+def read_range(path, start, end):
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line)
 
-    with open(INDEX_FILE, "w", encoding="utf-8") as out:
-        for token, postings in index.items():
-            out.write(json.dumps({
-                "token": token,
-                "postings": postings,  #[(doc_id, tf)]
-                "global_tf": global_tf[token]
-            }, ensure_ascii=False) + "\n")
+#rozdeli subor na parts rozsahov bajtov
+def split_ranges(path, parts):
+    size = os.path.getsize(path)
+    bounds = [size * i // parts for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts) if bounds[i] < bounds[i + 1]]
 
-    with open(DOC_STATS_FILE, "w", encoding="utf-8") as meta_out:
-        json.dump({
-            "total_docs": total_docs,
-            "doc_lengths": doc_lengths,
-            "docs": doc_meta
-        }, meta_out, ensure_ascii=False, indent=2)
+#worker paralelneho indexovania: jedna cast pages.jsonl s lokalnymi doc_id od 1
+#zvysok indexu z pamate sa tiez zapise ako run, hlavny proces dostane len cesty k suborom
+def index_shard(args):
+    shard, start, end, memory_mb = args
+    run_dir = os.path.join(RUN_DIR, f"shard-{shard:04d}")
+    total_docs, runs, index = invert(read_range(INPUT_FILE, start, end), run_dir, memory_mb, progress=False)
+    if index:
+        path = os.path.join(run_dir, f"run-{len(runs):05d}.bin")
+        write_run(path, memory_run(index))
+        runs.append(path)
+    return shard, total_docs, runs
+
+#zlucene postings zapise ako index.jsonl alebo binarny index, vrati pocet termov
+#kazdy term ma aj BM25 idf a najvacsi impact, search z nich odhaduje skore bez citania postings
+def write_index(binary, sources, total_docs, spills, norms):
+    unique = 0
+    if binary:
+        writer = IndexWriter(norms)
+        for token, postings, global_tf in merge_runs(sources):
+            writer.add(token, postings, global_tf)
+            unique += 1
+        writer.close(total_docs, (
+            (doc_id, dict(meta, length=length)) for doc_id, length, meta in read_spills(spills)
+        ))
+    else:
+        with open(INDEX_FILE, "w", encoding="utf-8") as out:
+            for token, postings, global_tf in merge_runs(sources):
+                out.write(json.dumps({
+                    "token": token,
+                    "postings": postings,  #[(doc_id, tf)]
+                    "global_tf": global_tf,
+                    "idf": bm25.idf(len(postings), total_docs),
+                    "max_impact": max(bm25.impact(tf, norms[doc_id]) for doc_id, tf in postings)
+                }, ensure_ascii=False) + "\n")
+                unique += 1
+    return unique
+
+#vytvori invertovany index, pri binary namiesto index.jsonl zapise binarny index pre mmap
+#runy sa na konci k-cestne zlucia, takze korpus moze byt vacsi nez RAM
+#pri workers > 1 sa pages.jsonl rozdeli podla bajtov, casti sa invertuju paralelne
+#a pri zluceni sa ich lokalne doc_id posunu o pocet dokumentov v predchadzajucich castiach
+def build_index(binary=False, memory_mb=MEMORY_MB, workers=1):
+    started = time.perf_counter()
+    if workers > 1:
+        ranges = split_ranges(INPUT_FILE, workers * SHARDS_PER_WORKER)
+        tasks = [(shard, start, end, max(1, memory_mb // workers)) for shard, (start, end) in enumerate(ranges)]
+        shards = []
+        with multiprocessing.Pool(workers) as pool:
+            for result in pool.imap_unordered(index_shard, tasks):
+                shards.append(result)
+                print(f"\rIndexed {len(shards)}/{len(tasks)} parts...", end="", flush=True)
+        shards.sort()
 
+        runs, spills = [], []
+        total_docs = 0
+        for shard, count, shard_runs in shards:
+            runs.extend((path, total_docs) for path in shard_runs)
+            spills.append((os.path.join(RUN_DIR, f"shard-{shard:04d}", "docs.jsonl"), total_docs))
+            total_docs += count
+        memory = []
+    else:
+        total_docs, disk_runs, index = invert(read_docs(), RUN_DIR, memory_mb)
+        runs = [(path, 0) for path in disk_runs]
+        spills = [(os.path.join(RUN_DIR, "docs.jsonl"), 0)]
+        memory = [memory_run(index)]
+    inverted = time.perf_counter() - started
+
+    print(f"\nTotal indexed: {total_docs}")
+    if len(runs) > 1 or runs and memory:
+        print(f"Merging {len(runs) + len(memory)} runs...")
+    sources = [read_run(path, offset) for path, offset in reduce_runs(runs)] + memory
+    avg_length, norms = doc_norms(total_docs, spills)
+    unique = write_index(binary, sources, total_docs, spills, norms)
+    print(f"Unique tokens: {unique}")
+    if binary:
+        print(f"Binary index: {TERMS_FILE}, {POSTINGS_FILE}, {DOCS_FILE}")
+
+    write_doc_stats(total_docs, avg_length, spills)
+    shutil.rmtree(RUN_DIR)
+
+    elapsed = time.perf_counter() - started
     print("Done.")
+    return total_docs, inverted, elapsed
+
+#postupne indexovanie s 1 az workers procesmi, vypise dokumenty za sekundu a zrychlenie
+def bench_scaling(binary, memory_mb, workers):
+    rows = []
+    for n in range(1, workers + 1):
+        total_docs, inverted, elapsed = build_index(binary, memory_mb, n)
+        rows.append((n, total_docs / inverted, total_docs / elapsed))
+    print(f"\n{'workers':>7s} {'invert docs/s':>14s} {'total docs/s':>13s} {'speedup':>8s}")
+    for n, invert_rate, total_rate in rows:
+        print(f"{n:7d} {invert_rate:14.1f} {total_rate:13.1f} {total_rate / rows[0][2]:7.2f}x")
+    print(f"CPU cores: {multiprocessing.cpu_count()}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vytvorenie invertovaneho indexu z pages.jsonl")
+    parser.add_argument("--binary", action="store_true",
+                        help=f"zapisat binarny index ({TERMS_FILE}, {POSTINGS_FILE}, {DOCS_FILE}) namiesto {INDEX_FILE}")
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB,
+                        help="pamat pre postings v MB (spolu pre vsetky procesy), po prekroceni sa ciastocny index zapise na disk")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="pocet procesov, pages.jsonl sa rozdeli podla bajtov a casti sa indexuju paralelne")
+    parser.add_argument("--scaling", action="store_true",
+                        help="postupne indexovat s 1 az --workers procesmi a vypisat docs/s")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    build_index()
+    args = parse_args()
+    if args.scaling:
+        bench_scaling(args.binary, args.memory_mb, args.workers)
+    else:
+        build_index(binary=args.binary, memory_mb=args.memory_mb, workers=args.workers)
@@ -0,0 +1,131 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import re
+import gzip
+import mmap
+import time
+import hashlib
+import sqlite3
+import threading
+
+STORE_DIR = "pages_store"
+INDEX_NAME = "index.db"
+#velkost segmentu po ktorej sa zacne novy subor
+SEGMENT_SIZE = 256 * 1024 * 1024
+
+#znaky, ktore v nazve suboru stranky v pages/ nahradi _
+PAGE_FILE_RE = re.compile(r"[^A-Za-z0-9_\-\.]")
+
+#nazov suboru stranky v adresari pages/ bez pripony, pouziva crawler pri ukladani aj extraktor pri --changes
+#spatne sa z nazvu URL presne poskladat neda (query, lomitka), preto sa subory hladaju podla URL a nie naopak
+def page_file_name(url):
+    return PAGE_FILE_RE.sub("_", url.replace("https://", "").replace("http://", ""))
+
+#cesta k segmentu podla jeho cisla
+def segment_path(store_dir, segment):
+    return os.path.join(store_dir, f"seg-{segment:05d}.gz")
+
+#citanie zaznamov zo segmentov cez mmap, pouziva sa aj samostatne vo workeroch extraktora
+class SegmentReader:
+    def __init__(self, store_dir=STORE_DIR):
+        self.dir = store_dir
+        self.maps = {}
+
+    def read(self, segment, offset, length):
+        mm = self.maps.get(segment)
+        #aktualny segment mohol od namapovania narast
+        if mm is None or offset + length > len(mm):
+            if mm is not None:
+                mm.close()
+            with open(segment_path(self.dir, segment), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.maps[segment] = mm
+        return gzip.decompress(mm[offset:offset + length]).decode("utf-8", errors="ignore")
+
+    def close(self):
+        for mm in self.maps.values():
+            mm.close()
+        self.maps = {}
+
+
+#ulozisko stranok: html sa zapisuje ako gzip zaznamy do velkych append-only segmentov
+#a index v sqlite drzi URL -> hash a hash -> (segment, offset, dlzka)
+#rovnake telo stranky sa ulozi len raz, segment sa da rozbalit aj cez zcat
+class PageStore:
+    def __init__(self, store_dir=STORE_DIR, segment_size=SEGMENT_SIZE):
+        os.makedirs(store_dir, exist_ok=True)
+        self.dir = store_dir
+        self.segment_size = segment_size
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(store_dir, INDEX_NAME), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "hash TEXT PRIMARY KEY, segment INTEGER, offset INTEGER, length INTEGER, size INTEGER)"
+        )
+        self.db.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, hash TEXT, stored REAL)")
+        self.db.commit()
+
+        row = self.db.execute("SELECT MAX(segment) FROM blobs").fetchone()
+        self.segment = row[0] or 0
+        self.out = open(segment_path(store_dir, self.segment), "ab")
+        self.reader = SegmentReader(store_dir)
+
+    def has(self, url):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    #ulozi stranku, vrati hash obsahu
+    def put(self, url, html_source):
+        body = html_source.encode("utf-8")
+        digest = hashlib.sha1(body).hexdigest()
+        with self.lock:
+            known = self.db.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if not known:
+                record = gzip.compress(body, compresslevel=6)
+                if self.out.tell() > 0 and self.out.tell() + len(record) > self.segment_size:
+                    self.out.close()
+                    self.segment += 1
+                    self.out = open(segment_path(self.dir, self.segment), "ab")
+                offset = self.out.tell()
+                self.out.write(record)
+                #data musia byt na disku skor ako index, inak by index ukazoval do prazdna
+                self.out.flush()
+                self.db.execute(
+                    "INSERT INTO blobs (hash, segment, offset, length, size) VALUES (?, ?, ?, ?, ?)",
+                    (digest, self.segment, offset, len(record), len(body))
+                )
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages (url, hash, stored) VALUES (?, ?, ?)",
+                (url, digest, time.time())
+            )
+            self.db.commit()
+        return digest
+
+    #vrati html stranky alebo None
+    def get(self, url):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT b.segment, b.offset, b.length FROM pages p JOIN blobs b ON b.hash = p.hash WHERE p.url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            return self.reader.read(*row)
+
+    #vsetky ulozene stranky zoradene podla segmentu a offsetu, aby sa segmenty citali sekvencne
+    def records(self):
+        with self.lock:
+            return self.db.execute(
+                "SELECT p.url, b.segment, b.offset, b.length, p.hash FROM pages p JOIN blobs b ON b.hash = p.hash "
+                "ORDER BY b.segment, b.offset"
+            ).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.out.close()
+            self.db.commit()
+            self.db.close()
+        self.reader.close()
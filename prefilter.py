@@ -0,0 +1,124 @@
+#
+# Dominik Mifkovič 2025
+#
+import re
+import zlib
+import hashlib
+from collections import Counter, defaultdict
+from page_store import SegmentReader
+from extractor_par import NOT_FOUND_RE, filename_to_url, is_not_found, page_type, strip_noise
+
+#lacny predfilter pred plnou extrakciou
+#worker precita len zaciatok stranky a ak je to 404, zvysok ani necita
+#z ostatnych stranok spravi sha1 obsahu a MinHash nacrt textu, hlavny proces potom vyhodi
+#presne a takmer rovnake stranky (napr. zrkadlene decisions) skor, nez ich spracuju extraktory
+
+#kolko znakov zo zaciatku stranky staci na 404 nadpis
+HEAD_BYTES = 8192
+#shingle su textove bloky medzi tagmi (odstavce, polozky, bunky) bez okrajovych medzier
+TEXT_BLOCK_RE = re.compile(r">\s*([^<]*[^<\s])")
+#MinHash nacrt (bottom-k): tolko najmensich hashov shinglov stranky
+SKETCH_SIZE = 64
+#stranky s odhadom Jaccardovej podobnosti shinglov aspon tolko su takmer duplikaty
+MIN_SIMILARITY = 0.85
+#kandidati na porovnanie su stranky, ktore maju spolocny niektory z tychto najmensich hashov
+#pri podobnosti 0.85 je sanca, ze dve stranky nezdielaju ani jeden, zanedbatelna
+LSH_KEYS = 4
+#hash, ktory ma tolko stranok, je blok zo sablony (napr. label "Year"), ako kluc sa preskoci
+#inak by sa kazda stranka porovnavala so vsetkymi strankami svojho typu
+BUCKET_LIMIT = 64
+#kratsie stranky nemaju dost shinglov na spolahlivy odhad, pre ne plati len presna zhoda
+MIN_SHINGLES = 8
+
+segment_reader = None
+
+#MinHash nacrt textovych blokov stranky, None ak ich je primalo
+#crc32 je rovnake v kazdom workeri (hash() retazca nie) a cele hashovanie aj triedenie bezi v C,
+#slovne n-gramy boli v Pythone drahsie nez samotna extrakcia
+def minhash(html_src):
+    shingles = set(TEXT_BLOCK_RE.findall(strip_noise(html_src)))
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    return tuple(sorted(map(zlib.crc32, map(str.encode, shingles)))[:SKETCH_SIZE])
+
+#odhad Jaccardovej podobnosti z dvoch nacrtov
+def similarity(a, b):
+    k = min(SKETCH_SIZE, len(a), len(b))
+    union = sorted(set(a) | set(b))[:k]
+    common = set(a) & set(b)
+    return sum(1 for h in union if h in common) / k
+
+#odtlacok stranky: (typ, sha1, nacrt), alebo (None, "404")
+def fingerprint(html_src, url):
+    if is_not_found(html_src):
+        return None, "404"
+    digest = hashlib.sha1(html_src.encode("utf-8", "ignore")).hexdigest()
+    doc_type = page_type(url)
+    #stranky bez extraktora aj tak nedaju dokument, nacrt sa pre ne nepocita
+    return (doc_type, digest, minhash(html_src) if doc_type else None), None
+
+def prefilter_file(args):
+    src_path, fname = args
+    try:
+        with open(src_path, "r", encoding="utf-8", errors="ignore") as f:
+            head = f.read(HEAD_BYTES)
+            if NOT_FOUND_RE.search(head):
+                return None, "404"
+            html_src = head + f.read()
+        return fingerprint(html_src, filename_to_url(fname))
+
+    except Exception as e:
+        return None, f"Error: {src_path}: {e}"
+
+#zaznam v page store je gzip, cita sa cely
+def prefilter_record(args):
+    global segment_reader
+    store_dir, url, segment, offset, length = args
+    try:
+        if segment_reader is None:
+            segment_reader = SegmentReader(store_dir)
+        return fingerprint(segment_reader.read(segment, offset, length), url)
+
+    except Exception as e:
+        return None, f"Error: {url}: {e}"
+
+
+#presne a takmer rovnake stranky, prva v poradi sa necha, dalsie sa zahodia
+#takmer duplikaty sa hladaju len medzi strankami rovnakeho typu
+class DuplicateFilter:
+    def __init__(self, min_similarity=MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self.exact = {}
+        #(typ, hash z nacrtu) -> [(nacrt, url)]
+        self.buckets = defaultdict(list)
+        self.skipped = Counter()
+
+    #None ak sa stranka necha, inak (druh duplikatu, url stranky ktorej je duplikatom)
+    def check(self, url, doc_type, digest, sketch):
+        original = self.exact.get(digest)
+        if original is not None:
+            self.skipped["exact"] += 1
+            return "exact", original
+        self.exact[digest] = url
+        if sketch is None:
+            return None
+
+        keys = []
+        for h in sketch:
+            key = (doc_type, h)
+            if len(self.buckets.get(key, ())) < BUCKET_LIMIT:
+                keys.append(key)
+                if len(keys) == LSH_KEYS:
+                    break
+        seen = set()
+        for key in keys:
+            for other, other_url in self.buckets.get(key, ()):
+                if other_url in seen:
+                    continue
+                seen.add(other_url)
+                if similarity(sketch, other) >= self.min_similarity:
+                    self.skipped["near"] += 1
+                    return "near", other_url
+        for key in keys:
+            self.buckets[key].append((sketch, url))
+        return None
@@ -0,0 +1,118 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import time
+from collections import OrderedDict
+
+#LRU cache s obmedzenou velkostou a TTL, pre vysledky dopytov aj dekodovane postings
+#vysledky su platne len pre index, z ktoreho vznikli: generacia su mtime a velkost suborov indexu
+#a ked sa zmeni, vlastnik cache index znova nacita a cache vyprazdni
+CACHE_SIZE = 1024
+#sekundy, None znamena bez expiracie
+CACHE_TTL = 600.0
+
+
+#(cesta, mtime_ns, velkost) pre kazdy subor, None pre subor ktory neexistuje
+def file_generation(paths):
+    out = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            out.append((path, None))
+            continue
+        out.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(out)
+
+#generacia vsetkych suborov v adresari (napr. Lucene index, kde commit pridava nove segmenty)
+def dir_generation(path):
+    try:
+        names = sorted(os.listdir(path))
+    except FileNotFoundError:
+        return ()
+    return file_generation(os.path.join(path, name) for name in names)
+
+
+class QueryCache:
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL, generation=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        #funkcia vracajuca aktualnu generaciu indexu, alebo None ak cache na index nezavisi
+        self.generation = generation
+        self.current = generation() if generation else None
+        #kluc -> (cas expiracie alebo None, hodnota), na konci su naposledy pouzite
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    #True ak sa generacia indexu od posledneho volania zmenila, cache sa vtedy vyprazdni
+    def check_generation(self):
+        if self.generation is None:
+            return False
+        current = self.generation()
+        if current == self.current:
+            return False
+        self.current = current
+        self.invalidations += 1
+        self.entries.clear()
+        return True
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires, value = entry
+        if expires is not None and time.monotonic() >= expires:
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self.entries[key] = (expires, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    #hodnota z cache, alebo ju spocita compute() a ulozi
+    def get_or_compute(self, key, compute):
+        value = self.get(key, self)
+        if value is self:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"{s['size']} entries, {s['hits']} hits, {s['misses']} misses ({s['hit_rate'] * 100:.1f}% hit rate), "
+                f"{s['evictions']} evicted, {s['expirations']} expired, {s['invalidations']} invalidations")
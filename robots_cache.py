@@ -0,0 +1,163 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+import urllib.robotparser
+from concurrent.futures import ThreadPoolExecutor
+
+ROBOTS_CACHE = "robots_cache.json"
+#po akom case sa robots.txt stiahne znova
+ROBOTS_TTL = 24 * 3600
+ROBOTS_TIMEOUT = 10
+
+#vytvori parser z ulozeneho zaznamu, pravidla pre chybove kody su rovnake ako v RobotFileParser.read
+def make_parser(entry):
+    rp = urllib.robotparser.RobotFileParser()
+    status = entry["status"]
+    if status in (401, 403):
+        rp.disallow_all = True
+    elif status is None or status >= 400:
+        #ak sa robots.txt neda nacitat, predpokladame ze mozeme
+        rp.allow_all = True
+    else:
+        rp.parse(entry["body"].splitlines())
+        #bez nastavenia casu by can_fetch aj crawl_delay tvrdili ze robots.txt este nebol nacitany
+        rp.modified()
+    return rp
+
+#Crawl-delay pre daneho agenta, RobotFileParser berie len cele cisla a desatinne hodnoty ignoruje
+def declared_delay(body, agent="*"):
+    group = []
+    in_rules = False
+    delay = None
+    for line in body.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        key = key.strip().lower()
+        value = value.strip()
+        if key == "user-agent":
+            if in_rules:
+                group = []
+                in_rules = False
+            group.append(value.lower())
+            continue
+        in_rules = True
+        if key == "crawl-delay" and (agent.lower() in group or (delay is None and "*" in group)):
+            try:
+                delay = float(value)
+            except ValueError:
+                pass
+    return delay
+
+#stiahne robots.txt pre host, vrati zaznam do cache
+def fetch_robots(base):
+    entry = {"fetched": time.time(), "status": None, "body": ""}
+    try:
+        with urllib.request.urlopen(base + "/robots.txt", timeout=ROBOTS_TIMEOUT) as resp:
+            entry["status"] = resp.status
+            entry["body"] = resp.read().decode("utf-8", errors="ignore")
+    except urllib.error.HTTPError as e:
+        entry["status"] = e.code
+    except Exception:
+        pass
+    return entry
+
+#cache robots.txt ulozena medzi behmi, po uplynuti TTL sa zaznam obnovi na pozadi
+#a kym sa nestiahne, pouziva sa stara verzia
+#kazdy host sa stahuje najviac raz naraz, kto potrebuje parser pocas stahovania, pocka na to iste stiahnutie
+class RobotsCache:
+    def __init__(self, path=ROBOTS_CACHE, ttl=ROBOTS_TTL, agent="*"):
+        self.path = path
+        self.ttl = ttl
+        self.agent = agent
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.parsers = {}
+        #host -> future prave beziaceho stahovania
+        self.pending = {}
+        self.pool = ThreadPoolExecutor(max_workers=2)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def _store(self, base, entry):
+        with self.lock:
+            self.entries[base] = entry
+            self.parsers[base] = make_parser(entry)
+            self.pending.pop(base, None)
+
+    def _refresh(self, base):
+        entry = fetch_robots(base)
+        with self.lock:
+            old = self.entries.get(base)
+        #ak sa obnova nepodari, ostane posledna znama verzia az do dalsieho TTL
+        if entry["status"] is None and old is not None:
+            entry = dict(old, fetched=entry["fetched"])
+        self._store(base, entry)
+
+    #spusti stiahnutie na pozadi, ak uz nebezi, vrati jeho future, volat pod lockom
+    def _submit(self, base):
+        future = self.pending.get(base)
+        #hotova future bez ulozeneho zaznamu (stahovanie zlyhalo alebo skoncilo pred zapisom do pending) sa nepouzije
+        if future is None or future.done():
+            future = self.pending[base] = self.pool.submit(self._refresh, base)
+        return future
+
+    #vrati parser pre host, prvy krat pocka na stiahnutie robots.txt (aj ked ho uz spustil prefetch)
+    def parser(self, base):
+        with self.lock:
+            entry = self.entries.get(base)
+            rp = self.parsers.get(base)
+            if entry is not None and rp is None:
+                rp = self.parsers[base] = make_parser(entry)
+            future = None
+            if entry is None:
+                future = self._submit(base)
+            elif time.time() - entry["fetched"] > self.ttl:
+                self._submit(base)
+        if rp is None:
+            future.result()
+            with self.lock:
+                rp = self.parsers[base]
+        return rp
+
+    #stiahne robots.txt pre hosty, ktore este nie su v cache alebo uz expirovali
+    def prefetch(self, bases):
+        with self.lock:
+            now = time.time()
+            for base in bases:
+                if base not in self.entries or now - self.entries[base]["fetched"] > self.ttl:
+                    self._submit(base)
+
+    def allowed(self, base, url):
+        return self.parser(base).can_fetch(self.agent, url)
+
+    #minimalny rozostup medzi requestmi v sekundach podla Crawl-delay alebo Request-rate, None ak host nic neudava
+    def crawl_delay(self, base):
+        rp = self.parser(base)
+        with self.lock:
+            body = self.entries[base]["body"]
+        delays = []
+        delay = declared_delay(body, self.agent)
+        if delay is not None:
+            delays.append(delay)
+        rate = rp.request_rate(self.agent)
+        if rate is not None and rate.requests > 0:
+            delays.append(rate.seconds / rate.requests)
+        return max(delays) if delays else None
+
+    def save(self):
+        with self.lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.save()
@@ -1,31 +1,47 @@
 #
 # Dominik Mifkovič 2025
 #
+import os
+import sys
 import json
 import math
-import unicodedata
-import re
+import time
+import random
+import argparse
+import importlib.util
+from collections import Counter
+import bm25
+import binary_index
+from daat import BinaryCursor, ListCursor, QueryTerm, BM25Term, top_k_and, list_blocks, with_impacts
+from taat import top_k_or
+from query_cache import QueryCache, CACHE_SIZE, CACHE_TTL, file_generation
+from analysis import tokenize
 
 INDEX_FILE = "index.jsonl"
 DOC_STATS_FILE = "docs_meta.json"
 DOC_SOURCE_FILE = "pages.jsonl"
+#Parquet z extractor_par.py --parquet, z neho staci nacitat stlpce url a title
+PAGES_PARQUET = "pages_parquet"
+#pocet dopytov pre --bench, ak nie je zadany subor s dopytmi
+BENCH_QUERIES = 200
 
 index = {}
 n_docs = 0
 docs = {}
+#BM25 idf a najvacsi impact termov z index.jsonl a normy dokumentov podla doc_id
+term_idf = {}
+term_max_impact = {}
+norms = []
+#tabulky blokov termov z index.jsonl pre kurzory daat/taat, caste termy sa tak neprechadzaju pri kazdom dopyte
+list_blocks_cache = QueryCache(binary_index.POSTINGS_CACHE_SIZE, ttl=None)
+#postings v NumPy poliach pre --engine numpy, vytvara sa az pri prvom pouziti
+numpy_postings = None
+#cache vysledkov dopytov, vytvori sa pri prvom preload
+result_cache = None
+cache_size = CACHE_SIZE
+cache_ttl = CACHE_TTL
 ready = False
 
-#regex pre tokenizaciu, berie aj cisla
-token_pattern = re.compile(r"[^\W_]+", re.UNICODE)
-
-def normalize_text(text):
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join([c for c in text if not unicodedata.combining(c)])
-    return text.lower()
-
-def tokenize(text):
-    return token_pattern.findall(normalize_text(text))
-
 #klasicke IDF
 def idf_classic(df, N):
     return math.log((N + 1) / (df + 1))
@@ -36,89 +52,368 @@ def idf_probabilistic(df, N):
         return 0.0
     return max(0.0, math.log((N - df) / df))
 
+#idf_mode -> idf funkcia, bm25 ma idf aj normy dokumentov predpocitane v indexe
+IDF_FUNCS = {"classic": idf_classic, "prob": idf_probabilistic}
+IDF_MODES = ["classic", "prob", "bm25"]
+
+#doc_id -> url a title, z Parquet sa citaju len tieto stlpce
+def load_docs():
+    if os.path.isdir(PAGES_PARQUET):
+        import columnar
+        if columnar.is_fresh(PAGES_PARQUET, DOC_SOURCE_FILE):
+            cols = columnar.read_columns(["doc_id", "url", "title"], PAGES_PARQUET)
+            return {
+                doc_id: {"url": url or "", "title": title or ""}
+                for doc_id, url, title in zip(cols["doc_id"], cols["url"], cols["title"])
+            }
+    loaded = {}
+    with open(DOC_SOURCE_FILE, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f, start=1):
+            d = json.loads(line)
+            loaded[i] = {"url": d.get("url", ""), "title": d.get("title", "")}
+    return loaded
+
+#binarny index sa pouzije ak existuje a nie je starsi nez index.jsonl
+def use_binary():
+    if not binary_index.exists():
+        return False
+    if not os.path.exists(INDEX_FILE):
+        return True
+    return os.path.getmtime(binary_index.TERMS_FILE) >= os.path.getmtime(INDEX_FILE)
+
+#generacia indexu pre cache vysledkov
+#index.terms sa pri binarnom indexe prepisuje posledny, docs_meta.json pri index.jsonl tiez
+def index_generation():
+    return file_generation([binary_index.TERMS_FILE, INDEX_FILE, DOC_STATS_FILE])
+
 #prednahratie indexu do pamate
+#binarny index sa len namapuje, postings aj metadata dokumentov sa dekoduju az pri dopyte
 def preload():
-    global index, n_docs, docs, ready
+    global index, n_docs, docs, norms, ready, result_cache
+
+    #generacia sa zaznamena pred nacitanim, zmena pocas nacitania sa prejavi pri dalsom dopyte
+    if result_cache is None:
+        result_cache = QueryCache(cache_size, cache_ttl, generation=index_generation)
+
+    if use_binary():
+        index = binary_index.BinaryIndex()
+        n_docs = index.n_docs
+        docs = index.docs
+        norms = index.docs.norms
+        ready = True
+        return
 
     with open(INDEX_FILE, "r", encoding="utf-8") as f:
         for line in f:
             item = json.loads(line)
             index[item["token"]] = item["postings"]
+            if "idf" in item:
+                term_idf[item["token"]] = item["idf"]
+            if "max_impact" in item:
+                term_max_impact[item["token"]] = item["max_impact"]
 
     with open(DOC_STATS_FILE, "r", encoding="utf-8") as f:
         meta = json.load(f)
     n_docs = int(meta["total_docs"])
+    #starsi docs_meta.json nema priemernu dlzku, pocita sa rovnako ako v indexer.py
+    lengths = [(int(doc_id), length) for doc_id, length in meta.get("doc_lengths", {}).items()]
+    avg_length = meta.get("avg_doc_length")
+    if avg_length is None:
+        avg_length = sum(length for _, length in lengths) / len(lengths) if lengths else 0.0
+    norms = bm25.doc_norms(lengths, n_docs, avg_length)
 
-    with open(DOC_SOURCE_FILE, "r", encoding="utf-8") as f:
-        for i, line in enumerate(f, start=1):
-            d = json.loads(line)
-            docs[i] = {"url": d.get("url", ""), "title": d.get("title", "")}
+    docs = load_docs()
 
     ready = True
 
-#hladanie v indexe
-def search(query, idf_mode="classic", top_k=10):
-    if not ready:
-        preload()
+#subory indexu sa zmenili (novy beh indexer.py), index sa nacita znova
+def reload():
+    global index, term_idf, term_max_impact, numpy_postings, ready
+    if isinstance(index, binary_index.BinaryIndex):
+        index.close()
+    index = {}
+    term_idf = {}
+    term_max_impact = {}
+    list_blocks_cache.clear()
+    numpy_postings = None
+    ready = False
+    preload()
 
-    tokens = tokenize(query)
-    if not tokens:
-        return []
+#BM25 idf termu z index.jsonl, starsi index ho nema
+def bm25_idf(token, df):
+    idf = term_idf.get(token)
+    return bm25.idf(df, n_docs) if idf is None else idf
 
-    if idf_mode == "classic":
-        idf_func = idf_classic
-    elif idf_mode == "prob":
-        idf_func = idf_probabilistic
-    else:
-        raise ValueError("Unknown idf_mode")
-
-    #nacitame postings pre kazdy token
-    token_postings = []
-    for token in tokens:
+#kurzor nad postings termu alebo None, ak term v indexe nie je
+#pri bm25 ma kurzor aj najvacsie impacty blokov
+def open_cursor(token, bm25_impacts=False):
+    if isinstance(index, binary_index.BinaryIndex):
+        blocks = index.blocks(token)
+        return BinaryCursor(index, blocks) if blocks else None
+    blocks = list_blocks_cache.get(token)
+    if blocks is None:
         postings = index.get(token)
         if not postings:
+            return None
+        blocks = list_blocks(postings, bm25_idf(token, len(postings)))
+        list_blocks_cache.put(token, blocks)
+    if bm25_impacts and blocks[-1] is None:
+        blocks = with_impacts(blocks, norms, term_max_impact.get(token))
+        list_blocks_cache.put(token, blocks)
+    return ListCursor(blocks)
+
+#termy dopytu s kurzormi, tokeny bez dokumentov sa vynechaju
+def query_terms(tokens, idf_mode):
+    terms = []
+    for token in tokens:
+        cursor = open_cursor(token, idf_mode == "bm25")
+        if cursor is None:
+            continue
+        if idf_mode == "bm25":
+            terms.append(BM25Term(cursor, norms))
+        else:
+            terms.append(QueryTerm(cursor, IDF_FUNCS[idf_mode](cursor.df, n_docs)))
+    return terms
+
+#document-at-a-time cez kurzory s preskakovanim blokov, pozri daat.py, len pre AND
+def rank_daat(tokens, idf_mode, top_k, min_match):
+    if min_match < len(tokens):
+        raise ValueError("Engine daat supports only AND queries")
+    terms = query_terms(tokens, idf_mode)
+    if len(terms) < len(tokens):
+        return []  #ak jeden token nema ziadne dokumenty, vratime prazdny vysledok
+    return top_k_and(terms, top_k)
+
+#term-at-a-time do pola akumulatorov, pozri taat.py
+def rank_taat(tokens, idf_mode, top_k, min_match):
+    return top_k_or(query_terms(tokens, idf_mode), n_docs, top_k, min_match)
+
+#vektorizovane vyhodnotenie nad NumPy poliami, pozri search_numpy.py
+def rank_numpy(tokens, idf_mode, top_k, min_match):
+    global numpy_postings
+    import search_numpy
+    if numpy_postings is None or numpy_postings.index is not index:
+        numpy_postings = search_numpy.NumpyPostings(index)
+    terms = []
+    for token in tokens:
+        arrays = numpy_postings.get(token)
+        if arrays is None:
+            continue
+        doc_ids, tfs = arrays
+        if idf_mode == "bm25":
+            scores = search_numpy.weights(doc_ids, tfs, bm25_idf(token, len(doc_ids)), np_norms())
+        else:
+            scores = search_numpy.weights(doc_ids, tfs, IDF_FUNCS[idf_mode](len(doc_ids), n_docs))
+        terms.append((doc_ids, scores))
+    if min_match == len(tokens):
+        if len(terms) < len(tokens):
             return []  #ak jeden token nema ziadne dokumenty, vratime prazdny vysledok
-        token_postings.append(dict(postings))  #dict kvoli rychlemu lookupu
+        return search_numpy.top_k_and(terms, top_k)
+    return search_numpy.top_k_or(terms, n_docs, top_k, min_match)
 
-    #prienik dokumentov obsahujucich vsetky tokeny
-    common_docs = set(token_postings[0].keys())
-    for p in token_postings[1:]:
-        common_docs &= set(p.keys())
+#BM25 normy ako NumPy pole bez kopirovania (array aj memoryview z mmap podporuju buffer protokol)
+def np_norms():
+    import numpy as np
+    return np.asarray(norms)
+
+#povodne vyhodnotenie: skore vsetkych dokumentov s aspon min_match tokenmi a zoradenie, referencia pre --bench
+def rank_exhaustive(tokens, idf_mode, top_k, min_match):
+    #nacitame postings pre kazdy token, tokeny bez dokumentov sa vynechaju
+    token_postings = []
+    found = []
+    for token in tokens:
+        postings = index.get(token)
+        if postings:
+            token_postings.append(dict(postings))  #dict kvoli rychlemu lookupu
+            found.append(token)
 
-    if not common_docs:
+    #dokumenty obsahujuce aspon min_match tokenov, pri AND prienik
+    matched = Counter(doc_id for p in token_postings for doc_id in p)
+    candidates = [doc_id for doc_id, count in matched.items() if count >= min_match]
+    if not candidates:
         return []
 
+    if idf_mode == "bm25":
+        idfs = [bm25_idf(token, len(p)) for token, p in zip(found, token_postings)]
+    else:
+        idfs = [IDF_FUNCS[idf_mode](len(p), n_docs) for p in token_postings]
+
     scores = {}
-    for doc_id in common_docs:
+    for doc_id in candidates:
         score = 0.0
-        for p in token_postings:
-            tf = p[doc_id]
-            df = len(p)
-            idf = idf_func(df, n_docs)
-            score += (1 + math.log(tf)) * idf
+        for p, idf in zip(token_postings, idfs):
+            tf = p.get(doc_id)
+            if tf is None:
+                continue
+            if idf_mode == "bm25":
+                score += idf * bm25.impact(tf, norms[doc_id])
+            else:
+                score += (1 + math.log(tf)) * idf
         scores[doc_id] = score
 
-    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    #pri rovnakom skore mensie doc_id, rovnako ako daat
+    ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+    return ranked[:top_k]
+
+ENGINES = {"daat": rank_daat, "taat": rank_taat, "numpy": rank_numpy, "exhaustive": rank_exhaustive}
+#enginy s volitelnou zavislostou
+ENGINE_MODULES = {"numpy": "numpy"}
+
+def engine_available(engine):
+    module = ENGINE_MODULES.get(engine)
+    return module is None or importlib.util.find_spec(module) is not None
+OPERATORS = ["and", "or"]
+
+#hladanie v indexe
+#operator "and" vyzaduje vsetky tokeny, "or" aspon min_should_match z nich
+#bez engine sa AND vyhodnoti cez daat a ciastocna zhoda cez taat
+#vysledky sa cachuju podla tokenov, idf_mode, top_k a min_match; engine v kluci nie je, vsetky vracaju to iste
+def search(query, idf_mode="classic", top_k=10, engine=None, operator="and", min_should_match=1, cache=True):
+    if not ready:
+        preload()
+    elif result_cache.check_generation():
+        reload()
+
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    if idf_mode not in IDF_MODES:
+        raise ValueError("Unknown idf_mode")
+    if operator not in OPERATORS:
+        raise ValueError("Unknown operator")
+    min_match = len(tokens) if operator == "and" else max(1, min_should_match)
+    if min_match > len(tokens):
+        return []
+    if engine is None:
+        engine = "daat" if min_match == len(tokens) else "taat"
+    if engine not in ENGINES:
+        raise ValueError("Unknown engine")
+
+    key = (tuple(tokens), idf_mode, top_k, min_match)
+    if cache:
+        cached = result_cache.get(key)
+        if cached is not None:
+            return [dict(r) for r in cached]
+
     results = []
-    for doc_id, score in ranked[:top_k]:
+    for doc_id, score in ENGINES[engine](tokens, idf_mode, top_k, min_match):
         doc = docs.get(doc_id, {})
         results.append({
             "title": doc.get("title", ""),
             "url": doc.get("url", ""),
             "score": round(score, 4)
         })
+    if cache:
+        result_cache.put(key, [dict(r) for r in results])
     return results
 
+#dopyty pre --bench: riadky suboru, alebo nahodne nazvy dokumentov (prve slova nazvu)
+def load_queries(path):
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    rng = random.Random(0)
+    queries = []
+    for _ in range(BENCH_QUERIES * 10):
+        title = docs.get(rng.randint(1, n_docs), {}).get("title") or ""
+        words = title.split()
+        if words:
+            queries.append(" ".join(words[:rng.randint(1, 3)]))
+        if len(queries) == BENCH_QUERIES:
+            break
+    return queries
+
+#latencia enginov na tych istych dopytoch v kazdom idf_mode, najprv sa overi, ze vracaju rovnake vysledky
+#ako exhaustive; pri OR sa daat vynecha, vie len AND
+#enginy sa meraju bez cache vysledkov, na konci sa zmeria druhy prechod dopytov cez cache
+def bench(queries, top_k, repeat, operator="and", min_should_match=1):
+    engines = [name for name in ENGINES if (operator == "and" or name != "daat") and engine_available(name)]
+    differing = checked = 0
+    for query in queries:
+        for mode in IDF_MODES:
+            expected = search(query, mode, top_k, "exhaustive", operator, min_should_match, cache=False)
+            for engine in engines:
+                if engine == "exhaustive":
+                    continue
+                checked += 1
+                if search(query, mode, top_k, engine, operator, min_should_match, cache=False) != expected:
+                    differing += 1
+                    print(f"[DIFF] {engine} {mode}: {query}")
+    print(f"Identical results: {checked - differing}/{checked}")
+
+    global numpy_postings
+    for mode in IDF_MODES:
+        for engine in engines:
+            #NumPy polia sa vytvaraju znova, s --repeat 1 sa meria aj ich konverzia
+            numpy_postings = None
+            times = bench_queries(queries, repeat, mode, top_k, engine, operator, min_should_match, False)
+            print_latency(f"{mode:8s} {engine:10s}", times)
+
+    result_cache.clear()
+    bench_queries(queries, 1, "classic", top_k, None, operator, min_should_match, True)
+    times = bench_queries(queries, 1, "classic", top_k, None, operator, min_should_match, True)
+    print_latency(f"{'classic':8s} {'cached':10s}", times)
+    print(f"Result cache: {result_cache.summary()}")
+    if isinstance(index, binary_index.BinaryIndex):
+        print(f"Postings cache: {index.postings_cache.summary()}")
+    return 1 if differing else 0
+
+#najlepsi cas z repeat behov pre kazdy dopyt
+def bench_queries(queries, repeat, mode, top_k, engine, operator, min_should_match, cache):
+    times = []
+    for query in queries:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search(query, mode, top_k, engine, operator, min_should_match, cache)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        times.append(best)
+    return times
+
+def print_latency(label, times):
+    times = sorted(times)
+    p50 = times[len(times) // 2]
+    p99 = times[min(len(times) - 1, math.ceil(0.99 * len(times)) - 1)]
+    print(f"{label} total {sum(times):7.3f}s | p50 {p50 * 1000:7.2f}ms | "
+          f"p99 {p99 * 1000:7.2f}ms | max {times[-1] * 1000:7.2f}ms")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vyhladavanie v indexe")
+    parser.add_argument("--engine", choices=sorted(ENGINES),
+                        help="sposob vyhodnotenia dopytu, predvolene daat pre AND a taat pre ciastocnu zhodu")
+    parser.add_argument("--top-k", type=int, default=10, help="pocet vysledkov")
+    parser.add_argument("--or", dest="operator", action="store_const", const="or", default="and",
+                        help="staci cast tokenov dopytu namiesto vsetkych")
+    parser.add_argument("--min-should-match", type=int, default=1,
+                        help="pri --or najmenej tolko tokenov dopytu musi dokument obsahovat")
+    parser.add_argument("--bench", nargs="?", const="", metavar="QUERIES",
+                        help="porovnat enginy na dopytoch zo suboru (jeden na riadok), bez suboru z nazvov dokumentov")
+    parser.add_argument("--repeat", type=int, default=3, help="pocet opakovani kazdeho dopytu pri --bench")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="pocet dopytov v cache vysledkov, 0 vypne cache")
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL, help="platnost vysledku v cache v sekundach, 0 bez expiracie")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    cache_size = args.cache_size
+    cache_ttl = args.cache_ttl or None
     preload()
+    if args.bench is not None:
+        queries = load_queries(args.bench)
+        print(f"Loaded {len(queries)} queries")
+        sys.exit(bench(queries, args.top_k, args.repeat, args.operator, args.min_should_match))
     while True:
         query = input("Query: ").strip()
         if not query:
             break
-        for mode in ["classic", "prob"]:
+        for mode in IDF_MODES:
             print(f"\nResults ({mode})")
-            results = search(query, idf_mode=mode)
+            results = search(query, idf_mode=mode, top_k=args.top_k, engine=args.engine,
+                             operator=args.operator, min_should_match=args.min_should_match)
             if not results:
                 print("No results.")
             for r in results:
                 print(f"[{r['score']:.4f}] {r['url']} — {r['title']}")
+    print(f"Result cache: {result_cache.summary()}")
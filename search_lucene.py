@@ -24,6 +24,7 @@ from org.apache.lucene.queryparser.classic import QueryParser, QueryParserBase
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
+from query_cache import QueryCache, dir_generation
 
 console = Console()
 
@@ -127,6 +128,8 @@ def main():
     reader = DirectoryReader.open(directory)
     searcher = IndexSearcher(reader)
     analyzer = StandardAnalyzer()
+    #opakovane dopyty sa necitaju znova z indexu, novy commit do INDEX_DIR cache vyprazdni
+    cache = QueryCache(generation=lambda: dir_generation(INDEX_DIR))
 
     while True:
         try:
@@ -134,6 +137,13 @@ def main():
         except EOFError:
             break
 
+        if cache.check_generation():
+            changed = DirectoryReader.openIfChanged(reader)
+            if changed is not None:
+                reader.close()
+                reader = changed
+                searcher = IndexSearcher(reader)
+
         if not q_raw:
             continue
 
@@ -150,16 +160,19 @@ def main():
             main_query_text = q_raw
 
         try:
-            flags = [BooleanClause.Occur.SHOULD] * len(SEARCH_FIELDS)
-            query = MultiFieldQueryParser.parse(
-                [main_query_text] * len(SEARCH_FIELDS),
-                SEARCH_FIELDS,
-                flags,
-                analyzer
-            )
+            def run_search():
+                flags = [BooleanClause.Occur.SHOULD] * len(SEARCH_FIELDS)
+                query = MultiFieldQueryParser.parse(
+                    [main_query_text] * len(SEARCH_FIELDS),
+                    SEARCH_FIELDS,
+                    flags,
+                    analyzer
+                )
+                hits = searcher.search(query, 10)
+                return hits.totalHits.value(), [(sd.doc, sd.score) for sd in hits.scoreDocs]
 
-            hits = searcher.search(query, 10)
-            total = hits.totalHits.value()
+            #kluc je text dopytu so zjednotenymi medzerami, velkost pismen nechavame kvoli operatorom AND/OR
+            total, top = cache.get_or_compute(" ".join(main_query_text.split()), run_search)
 
             print(f"\nFound {total} results:\n")
 
@@ -173,8 +186,7 @@ def main():
 
             stored_fields = searcher.storedFields()
 
-            for sd in hits.scoreDocs:
-                doc_id = sd.doc
+            for doc_id, score in top:
                 doc = stored_fields.document(doc_id)
 
                 title = (
@@ -195,7 +207,7 @@ def main():
 
                 header = Text()
                 header.append(title, style="bold red")
-                header.append(f"  (score={sd.score:.2f})", style="bold yellow")
+                header.append(f"  (score={score:.2f})", style="bold yellow")
 
                 body = ""
 
@@ -215,6 +227,7 @@ def main():
         except Exception as e:
             print("ERROR:", e)
 
+    print(f"Query cache: {cache.summary()}")
     reader.close()
 
 
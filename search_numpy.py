@@ -0,0 +1,124 @@
+#
+# Dominik Mifkovič 2025
+#
+import numpy as np
+import bm25
+import binary_index
+from query_cache import QueryCache
+
+#vektorizovane vyhodnotenie dopytu nad postings v NumPy poliach, search.py --engine numpy
+#postings termu su dve suvisle polia: doc_id (int32) a tf (uint16), skore sa pocita naraz pre cele pole
+#a prienik, akumulacia aj vyber top-k bezia v NumPy namiesto cyklu v Pythone po dokumentoch
+#polia sa vytvaraju pri prvom pouziti termu a caste termy sa drzia v LRU cache
+
+TF_DTYPE = np.uint16
+#kolko termov s NumPy poliami sa drzi v pamati
+ARRAYS_CACHE_SIZE = 4096
+
+
+#varinty z binary_index naraz: konce cisel su bajty bez horneho bitu,
+#kazdy bajt sa posunie o 7 * poradie v cisle a bajty jedneho cisla sa scitaju cez reduceat
+def decode_varints(buf):
+    data = np.frombuffer(buf, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.zeros(len(ends), dtype=np.int64)
+    starts[1:] = ends[:-1] + 1
+    shifts = (np.arange(len(data)) - np.repeat(starts, ends - starts + 1)) * 7
+    return np.add.reduceat((data & 0x7F).astype(np.uint64) << shifts.astype(np.uint64), starts)
+
+def to_arrays(doc_ids, tfs):
+    doc_ids = np.asarray(doc_ids, dtype=np.int32)
+    tfs = np.asarray(tfs)
+    #tf nad rozsah uint16 sa neorezava, pole ostane sirsie
+    if len(tfs) and tfs.max() > np.iinfo(TF_DTYPE).max:
+        return doc_ids, tfs.astype(np.uint32)
+    return doc_ids, tfs.astype(TF_DTYPE)
+
+
+#postings termov ako (doc_id, tf) polia nad indexom zo search.py (dict z index.jsonl alebo BinaryIndex)
+class NumpyPostings:
+    def __init__(self, index, cache_size=ARRAYS_CACHE_SIZE):
+        self.index = index
+        self.cache = QueryCache(cache_size, ttl=None)
+
+    def get(self, token):
+        arrays = self.cache.get(token)
+        if arrays is not None:
+            return arrays
+        if isinstance(self.index, binary_index.BinaryIndex):
+            entry = self.index.lookup(token)
+            if entry is None:
+                return None
+            _, offset, length = entry[:3]
+            values = decode_varints(self.index.postings_mm[offset:offset + length])
+            arrays = to_arrays(np.cumsum(values[0::2]), values[1::2])
+        else:
+            postings = self.index.get(token)
+            if not postings:
+                return None
+            pairs = np.array(postings, dtype=np.int64).reshape(-1, 2)
+            arrays = to_arrays(pairs[:, 0], pairs[:, 1])
+        self.cache.put(token, arrays)
+        return arrays
+
+
+#skore postingov termu, rovnake vzorce ako daat.QueryTerm a BM25Term
+def weights(doc_ids, tfs, idf, norms=None):
+    tfs = tfs.astype(np.float64)
+    if norms is None:
+        return (1 + np.log(tfs)) * idf
+    return idf * (tfs * (bm25.K1 + 1) / (tfs + norms[doc_ids]))
+
+#prienik dvoch zoradenych poli doc_id, vrati (spolocne doc_id, indexy v a, indexy v b)
+#kratsie pole sa hlada v dlhsom binarnym vyhladavanim, pri roznych dlzkach je to rychlejsie nez intersect1d
+def intersect(a, b):
+    if len(a) > len(b):
+        common, ib, ia = intersect(b, a)
+        return common, ia, ib
+    pos = np.searchsorted(b, a)
+    pos[pos == len(b)] = 0
+    ia = np.flatnonzero(b[pos] == a)
+    return a[ia], ia, pos[ia]
+
+#top-k z kandidatov zoradenych podla doc_id ako [(doc_id, skore)]
+#argpartition najde k-te najvacsie skore, pri rovnosti na hranici sa beru mensie doc_id ako v daat
+def select_top_k(doc_ids, scores, k):
+    if len(scores) > k:
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        keep = np.concatenate([above, ties])
+    else:
+        keep = np.arange(len(scores))
+    keep = keep[np.lexsort((doc_ids[keep], -scores[keep]))]
+    return list(zip(doc_ids[keep].tolist(), scores[keep].tolist()))
+
+#dokumenty so vsetkymi termami, terms su dvojice (doc_id, skore postingov) v poradi dopytu
+def top_k_and(terms, k):
+    if not terms or k <= 0:
+        return []
+    common = terms[0][0]
+    positions = [np.arange(len(common))]
+    for doc_ids, _ in terms[1:]:
+        common, keep, found = intersect(common, doc_ids)
+        positions = [pos[keep] for pos in positions] + [found]
+        if not len(common):
+            return []
+    #skore sa scitava v poradi termov ako v daat
+    scores = terms[0][1][positions[0]].copy()
+    for (_, term_scores), pos in zip(terms[1:], positions[1:]):
+        scores += term_scores[pos]
+    return select_top_k(common, scores, k)
+
+#dokumenty s aspon min_match termami, akumulatory su husto podla doc_id ako v taat
+def top_k_or(terms, n_docs, k, min_match=1):
+    if not terms or k <= 0 or min_match > len(terms):
+        return []
+    scores = np.zeros(n_docs + 1)
+    matched = np.zeros(n_docs + 1, dtype=np.int32)
+    for doc_ids, term_scores in terms:
+        #doc_id su v ramci termu unikatne, takze staci indexove += namiesto np.add.at
+        scores[doc_ids] += term_scores
+        matched[doc_ids] += 1
+    candidates = np.flatnonzero(matched >= min_match)
+    return select_top_k(candidates, scores[candidates], k)
@@ -0,0 +1,30 @@
+#
+# Dominik Mifkovič 2025
+#
+import heapq
+from array import array
+from itertools import compress
+
+#term-at-a-time vyhodnotenie ciastocnej zhody (OR s min_should_match)
+#postings kazdeho termu sa prejdu cele a skore sa pripocitava do pola akumulatorov indexovaneho doc_id,
+#druhe pole pocita, kolko termov dopytu dokument obsahuje
+#doc_id su husto od 1 po n_docs, takze polia su lacnejsie nez dict a vyber kandidatov bezi v C
+
+#top-k dokumentov, ktore obsahuju aspon min_match termov, ako [(doc_id, skore)] zoradene podla skore
+#terms su daat.QueryTerm/BM25Term, skore sa scitava v poradi termov dopytu ako v daat.top_k_and,
+#takze pri min_match rovnom poctu termov su vysledky rovnake
+def top_k_or(terms, n_docs, k, min_match=1):
+    if not terms or k <= 0 or min_match > len(terms):
+        return []
+    scores = array("d", bytes(8 * (n_docs + 1)))
+    matched = array("H", bytes(2 * (n_docs + 1)))
+    for t in terms:
+        score = t.score
+        for docs, tfs in t.cursor.all_blocks():
+            for doc_id, tf in zip(docs, tfs):
+                scores[doc_id] += score(tf, doc_id)
+                matched[doc_id] += 1
+
+    candidates = compress(range(n_docs + 1), map(min_match.__le__, matched))
+    best = heapq.nlargest(k, candidates, key=lambda doc_id: (scores[doc_id], -doc_id))
+    return [(doc_id, scores[doc_id]) for doc_id in best]
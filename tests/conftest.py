@@ -0,0 +1,8 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import sys
+
+#moduly su v koreni repozitara
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,66 @@
+#
+# Dominik Mifkovič 2025
+#
+import json
+import pytest
+
+pytest.importorskip("pyarrow")
+import columnar
+
+
+def write_source(path, docs):
+    with open(path, "w", encoding="utf-8") as f:
+        for doc in docs:
+            f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+#zapise docs do Parquet a nacita ich spat v poradi doc_id
+def roundtrip(tmp_path, docs, row_group):
+    source = tmp_path / "pages.jsonl"
+    out_dir = tmp_path / "pages_parquet"
+    write_source(source, docs)
+    counts = columnar.write_parquet(str(source), str(out_dir), row_group)
+    read = list(columnar.iter_docs(str(out_dir)))
+    assert [doc_id for doc_id, _ in read] == list(range(1, len(docs) + 1))
+    return counts, [doc for _, doc in read]
+
+
+def decision(i, **extra):
+    return dict({"url": f"https://whc.unesco.org/en/decisions/{i}/", "type": "decision", "decision_id": i,
+                 "title": f"Decision {i}", "year": 2000 + i % 25, "themes": ["Conservation"]}, **extra)
+
+#viac davok jedneho typu ide do toho isteho writera
+def test_more_rows_than_row_group(tmp_path):
+    docs = [decision(i) for i in range(1, 26)]
+    counts, read = roundtrip(tmp_path, docs, 4)
+    assert counts == {"decision": 25}
+    assert read == docs
+
+#pole, ktore SCHEMAS nema, sa nesmie stratit
+def test_field_outside_schema_is_kept(tmp_path):
+    docs = [decision(i) for i in range(1, 4)] + [decision(4, new_field="value")] + [decision(5)]
+    _, read = roundtrip(tmp_path, docs, 2)
+    assert read == docs
+
+#typ bez schemy: stlpec s len None v prvej davke a hodnotou neskor, int neskor rozsireny na float
+def test_schema_widens_across_batches(tmp_path):
+    docs = [
+        {"url": "https://example.org/1", "type": "unknown", "title": None, "size": 1},
+        {"url": "https://example.org/2", "type": "unknown", "title": None, "size": 2},
+        {"url": "https://example.org/3", "type": "unknown", "title": "x", "size": 2.5},
+        {"url": "https://example.org/4", "type": "unknown", "title": "y", "size": 3},
+    ]
+    counts, read = roundtrip(tmp_path, docs, 2)
+    assert counts == {"unknown": 4}
+    assert [doc.get("title") for doc in read] == [None, None, "x", "y"]
+    assert [doc["size"] for doc in read] == [1.0, 2.0, 2.5, 3.0]
+
+def test_types_are_interleaved_by_doc_id(tmp_path):
+    docs = []
+    for i in range(1, 30):
+        if i % 3:
+            docs.append(decision(i))
+        else:
+            docs.append({"url": f"https://whc.unesco.org/en/soc/{i}/", "type": "soc", "soc_id": i, "title": f"SOC {i}"})
+    counts, read = roundtrip(tmp_path, docs, 5)
+    assert counts == {"decision": 20, "soc": 9}
+    assert read == docs
@@ -0,0 +1,31 @@
+#
+# Dominik Mifkovič 2025
+#
+import os
+import pytest
+from bench_extractor import FIXTURES_DIR, load_fixtures, load_expected
+from extractor_par import PAGE_SPECS, process_html
+
+#fixtures su v koreni repozitara
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, FIXTURES_DIR)
+PAGES = sorted(load_fixtures(FIXTURES))
+EXPECTED = load_expected(FIXTURES)
+
+
+@pytest.mark.parametrize("url, html_src", PAGES, ids=[url for url, _ in PAGES])
+def test_fixture_page(url, html_src):
+    doc, _ = process_html(html_src, url)
+    assert doc == EXPECTED.get(url)
+
+def test_every_expected_document_has_a_page():
+    assert set(EXPECTED) <= {url for url, _ in PAGES}
+
+#nove pole v PageSpec musi mat fixture, inak by ho nic nekontrolovalo
+def test_fixtures_cover_every_field():
+    covered = {}
+    for doc in EXPECTED.values():
+        covered.setdefault(doc["type"], set()).update(doc)
+    missing = [f"{spec.type}.{field.name}" for spec in PAGE_SPECS for field in spec.fields
+               if field.name not in covered.get(spec.type, ())]
+    assert not missing